@@ -1,4 +1,7 @@
 
+import time
+_import_started = time.perf_counter()
+
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 import os
@@ -7,11 +10,11 @@ import traceback
 from datetime import datetime
 import logging
 
-# Setup Logging
+# Setup Logging (DEBUG makes pdfminer log every parsed object - opt in via LOG_LEVEL)
 log_file = os.environ.get('LOG_FILE', 'server.log')
 logging.basicConfig(
     filename=log_file,
-    level=logging.DEBUG,
+    level=getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO),
     format='%(asctime)s %(levelname)s: %(message)s'
 )
 logging.info("Server starting up...")
@@ -31,13 +34,17 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 try:
     from backend.etl.pipeline import ETLPipeline
+    from backend.etl.warmup import warm_up, report_startup
     from backend.supabase_client import SupabaseLogger
+    from backend.uploads import ingest_upload, check_content_length, UploadTooLarge
 except ImportError as e:
     # Fallback for direct module execution
     logging.warning(f"Standard import failed: {e}. Trying local import.")
     try:
         from etl.pipeline import ETLPipeline
+        from etl.warmup import warm_up, report_startup
         from supabase_client import SupabaseLogger
+        from uploads import ingest_upload, check_content_length, UploadTooLarge
     except ImportError as e2:
         logging.critical(f"CRITICAL: Could not import ETLPipeline or SupabaseLogger. Path: {sys.path}")
         raise e2
@@ -90,6 +97,9 @@ def get_client_ip():
 etl_pipeline = ETLPipeline()
 db_logger = SupabaseLogger()
 
+# Parsers/writers load on first use; gunicorn.conf.py warms them before forking
+report_startup("app import", {"total": (time.perf_counter() - _import_started) * 1000})
+
 # Environment variables for dynamic URL (used in success frame & logs)
 # Defaulting to the production URL to ensure reliability if Render environment variables aren't yet configured.
 API_BASE_URL = os.environ.get('API_BASE_URL', 'https://quickconverter-2wn9.onrender.com').rstrip('/')
@@ -128,8 +138,17 @@ def get_user_usage():
 import json
 from flask import Response, stream_with_context
 
+SIZE_LIMITS_MB = {'guest': 2, 'free': 10, 'pro': 50}
+
+
 @app.route('/convert/document', methods=['POST'])
 def convert_document():
+    # Reject oversized bodies from Content-Length before the form is parsed
+    try:
+        check_content_length(request.content_length, max(SIZE_LIMITS_MB.values()) * 1024 * 1024)
+    except UploadTooLarge as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
+
     if 'file' not in request.files:
         return jsonify({"error": "No file part"}), 400
     
@@ -152,24 +171,24 @@ def convert_document():
 
     # ─── 1. Size Validation (Must happen now while file is open) ───
     # Authenticated user source of truth
+    category_rules = None
     if user_id:
         user_tier = db_logger.get_user_tier(user_id)
+        category_rules = db_logger.get_user_category_rules(user_id)
 
-    size_limits = {'guest': 2, 'free': 10, 'pro': 50}
-    max_mb = size_limits.get(user_tier, 2)
-    
-    file.seek(0, os.SEEK_END)
-    file_size_mb = file.tell() / (1024 * 1024)
-    file.seek(0)
-
-    if file_size_mb > max_mb:
-        return jsonify({"status": "failed", "error": f"File too large ({file_size_mb:.1f}MB). Max is {max_mb}MB."}), 400
+    max_mb = SIZE_LIMITS_MB.get(user_tier, 2)
+    max_bytes = max_mb * 1024 * 1024
 
     # ─── 2. Persistent Storage (Save immediately) ───
+    # One pass over the stream: size limit, write to disk and SHA-256
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     safe_filename = f"{timestamp}_{file.filename.replace(' ', '_')}"
     temp_path = os.path.join(UPLOAD_FOLDER, safe_filename)
-    file.save(temp_path)
+    try:
+        check_content_length(request.content_length, max_bytes)
+        file_size, document_hash = ingest_upload(file.stream, temp_path, max_bytes)
+    except UploadTooLarge as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
 
     def generate():
         # Inside the generator, we ONLY use strings (temp_path, user_id, etc.)
@@ -177,7 +196,7 @@ def convert_document():
         
         # Quota Logic (Check before processing)
         usage_used = 0
-        usage_limit = size_limits.get(user_tier, 2) # Reuse for file size but overwrite for count
+        usage_limit = SIZE_LIMITS_MB.get(user_tier, 2) # Reuse for file size but overwrite for count
 
         if user_tier == 'guest':
             usage_used = db_logger.get_user_usage_count(ip=ip)
@@ -199,8 +218,14 @@ def convert_document():
         yield json.dumps({"p": 5, "status": "Initializing..."}) + "\n"
 
         try:
+            # Output goes straight to its file under outputs/ (streamed for CSV / NDJSON)
+            ext = target_format if target_format != 'text' else 'txt'
+            out_filename = f"converted_{os.path.splitext(safe_filename)[0]}.{ext}"
+            out_path = os.path.join(OUTPUT_FOLDER, out_filename)
+
             # Start the ETL Pipeline Generator
-            pipeline_gen = etl_pipeline.process(temp_path, file_ext, target_format)
+            pipeline_gen = etl_pipeline.process(temp_path, file_ext, target_format, document_hash=document_hash,
+                                                category_rules=category_rules, output_path=out_path)
             
             last_stats = None
             final_result = None
@@ -217,14 +242,6 @@ def convert_document():
                 yield json.dumps({"status": "failed", "error": error_msg}) + "\n"
                 return
 
-            # Save Output
-            ext = target_format if target_format != 'text' else 'txt'
-            out_filename = f"converted_{os.path.splitext(safe_filename)[0]}.{ext}"
-            out_path = os.path.join(OUTPUT_FOLDER, out_filename)
-            
-            with open(out_path, 'wb') as f:
-                f.write(final_result["output_buffer"].getvalue())
-            
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             
@@ -254,6 +271,7 @@ def convert_document():
                 "dq_summary": last_stats["dq_stats"],
                 "preview": final_result.get("preview_data", []),
                 "download_url": f"{API_BASE_URL}/download/{out_filename}",
+                "download_token": final_result.get("download_token"),
                 "document_hash": last_stats["document_hash"],
                 "usage": {"used": optimistic_count, "limit": usage_limit, "ip": ip},
                 "db_log": db_status
@@ -286,6 +304,21 @@ def download_file(filename):
     return jsonify({"error": "File not found"}), 404
 
 
+@app.route('/download/<download_token>/<target_format>', methods=['GET'])
+def download_rendering(download_token, target_format):
+    """
+    Any output format of an earlier conversion, rendered from its stored result on first request.
+    The token is issued to whoever ran that conversion (success frame "download_token").
+    """
+    try:
+        path = etl_pipeline.render(download_token, target_format)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if path is None:
+        return jsonify({"error": "Result not found or expired - please convert the file again"}), 404
+    return send_file(path, as_attachment=True, download_name=f"converted.{target_format}")
+
+
 import hmac
 import hashlib
 
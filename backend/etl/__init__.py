@@ -4,12 +4,30 @@ ETL Package - Deterministic Bank Statement to Excel Converter
 Modules:
 - extract: PDF/CSV parsing with hybrid capture
 - transform: Regex-based normalization and deduplication
+- lexer: Precompiled tokenizer for the raw-text fallback
+- dates: Statement-level date format inference and ISO normalization
+- money: Integer-cents amount parsing and exact totals
+- keywords: Shared Aho-Corasick keyword matcher for rule scans
 - dq: Data Quality scoring engine
+- duplicates: Blocking-index near-duplicate transaction detection
 - load: Multi-sheet Excel generation
+- results: On-disk canonical results, rendered to other formats on demand
 - pipeline: Main orchestrator
 - schema: TypedDict definitions
-"""
-from .pipeline import ETLPipeline
-from .schema import Transaction, ExtractionPayload, PipelineResult
+- warmup: Pre-import heavy dependencies and compile rule sets before serving
+- bench: Stage throughput benchmarks (python -m etl.bench)
 
+Exports resolve on first attribute access so that importing the package
+(e.g. for etl.config) does not pull in the whole pipeline.
+"""
 __all__ = ['ETLPipeline', 'Transaction', 'ExtractionPayload', 'PipelineResult']
+
+
+def __getattr__(name):
+    if name == 'ETLPipeline':
+        from .pipeline import ETLPipeline
+        return ETLPipeline
+    if name in ('Transaction', 'ExtractionPayload', 'PipelineResult'):
+        from . import schema
+        return getattr(schema, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
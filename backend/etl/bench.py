@@ -0,0 +1,323 @@
+"""
+ETL Micro-benchmarks - Throughput checks for individual pipeline stages.
+
+Run from the backend directory:
+    python -m etl.bench lexer [--lines N] [--pdf statement.pdf]
+    python -m etl.bench categorize [--lines N] [--pdf statement.pdf]
+    python -m etl.bench concurrency [--threads N] [--docs N] [--rows N]
+    python -m etl.bench excel [--rows N]
+
+Each benchmark prints one JSON object so results can be diffed or logged.
+The excel benchmark runs each writer in its own child process, so that
+peak RSS is measured per writer.
+The concurrency stress test exits non-zero if any concurrent result differs
+from the same document converted alone.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from .transform import HeuristicTransformer
+from .categorize import CategoryMapper
+from .load import UniversalLoader
+from .pipeline import ETLPipeline
+
+
+def _synthetic_statement_lines(count: int, seed: int = 7) -> List[str]:
+    """Raw-text lines shaped like pdfplumber output of a bank statement."""
+    rnd = random.Random(seed)
+    merchants = ["STARBUCKS #1234", "UBER TRIP", "PAYROLL DIRECT DEPOSIT", "ATM WITHDRAWAL",
+                 "AMAZON MKTPLACE", "ZELLE TRANSFER TO J SMITH", "MONTHLY SERVICE FEE", "CHECK 1043"]
+    noise = ["Page 2 of 5", "Account Number: ****1234", "Statement Period 01/01/2024 - 01/31/2024",
+             "Customer Service 1-800-555-0100", "Total Credits 4,210.00", ""]
+    lines = []
+    balance = 5000.0
+    for i in range(count):
+        if rnd.random() < 0.25:
+            lines.append(rnd.choice(noise))
+            continue
+        amount = round(rnd.uniform(1, 2500), 2)
+        balance += amount if rnd.random() < 0.3 else -amount
+        lines.append(f"{rnd.randint(1, 12):02d}/{rnd.randint(1, 28):02d} {rnd.choice(merchants)} "
+                     f"{amount:,.2f} {balance:,.2f}")
+    return lines
+
+
+def _synthetic_descriptions(count: int, seed: int = 7) -> List[str]:
+    """Merchant descriptions with per-transaction store numbers, dates and card suffixes."""
+    rnd = random.Random(seed)
+    merchants = ["STARBUCKS", "UBER TRIP", "PAYROLL DIRECT DEPOSIT", "SHELL OIL", "AMAZON MKTPLACE",
+                 "ZELLE TRANSFER TO J SMITH", "MONTHLY SERVICE FEE", "WALGREENS", "LOCAL HARDWARE CO"]
+    suffixes = [lambda: f"#{rnd.randint(100, 9999)}", lambda: f"{rnd.randint(1, 12):02d}/{rnd.randint(1, 28):02d}",
+                lambda: f"CARD XXXX{rnd.randint(1000, 9999)}", lambda: ""]
+    return [f"{rnd.choice(merchants)} {rnd.choice(suffixes)()}".strip() for _ in range(count)]
+
+
+def _pdf_lines(path: str) -> List[str]:
+    from .extract import PDFParser
+    return PDFParser().parse(path)["raw_text"].split("\n")
+
+
+def bench_lexer(lines: int = 200000, pdf: Optional[str] = None, repeat: int = 3) -> Dict[str, Any]:
+    """Lines/sec of the raw-text fallback (HeuristicTransformer._transform_raw_text)."""
+    sample = _pdf_lines(pdf) if pdf else _synthetic_statement_lines(lines)
+    raw_text = "\n".join(sample)
+    transformer = HeuristicTransformer()
+
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        results: list = []
+        t0 = time.perf_counter()
+        transformer._transform_raw_text(raw_text, "bench", Counter(), results)
+        best = min(best, time.perf_counter() - t0)
+        found = len(results)
+
+    return {
+        "benchmark": "lexer",
+        "source": pdf or "synthetic",
+        "lines": len(sample),
+        "transactions": found,
+        "seconds": round(best, 4),
+        "lines_per_sec": round(len(sample) / best) if best else None,
+    }
+
+
+def bench_categorize(lines: int = 200000, pdf: Optional[str] = None, repeat: int = 3) -> Dict[str, Any]:
+    """Rows/sec of CategoryMapper.categorize_batch, uncached vs with the merchant LRU."""
+    if pdf:
+        results: list = []
+        HeuristicTransformer()._transform_raw_text("\n".join(_pdf_lines(pdf)), "bench", Counter(), results)
+        descriptions = [tx["description"] for tx in results]
+    else:
+        descriptions = _synthetic_descriptions(lines)
+
+    timings = {}
+    for label, cache_size in (("uncached", 0), ("cached", None)):
+        best = float("inf")
+        for _ in range(repeat):
+            mapper = CategoryMapper() if cache_size is None else CategoryMapper(cache_size=cache_size)
+            t0 = time.perf_counter()
+            mapper.categorize_batch(descriptions)
+            best = min(best, time.perf_counter() - t0)
+        timings[label] = best
+
+    return {
+        "benchmark": "categorize",
+        "source": pdf or "synthetic",
+        "rows": len(descriptions),
+        "uncached_rows_per_sec": round(len(descriptions) / timings["uncached"]) if timings["uncached"] else None,
+        "cached_rows_per_sec": round(len(descriptions) / timings["cached"]) if timings["cached"] else None,
+        "cache": mapper.get_cache_stats(),
+    }
+
+
+def _write_stress_documents(directory: str, docs: int, rows: int, seed: int = 11) -> List[str]:
+    """
+    Statements that exercise every piece of per-run state differently:
+    CSVs with different column layouts (column map) and day/month order
+    (date inference), and text files (raw-text fallback counters), each
+    with its own merchants, amounts and balance chain.
+    """
+    rnd = random.Random(seed)
+    layouts = [["Date", "Description", "Debit", "Credit", "Balance"],
+               ["Balance", "Credit", "Debit", "Description", "Date"],
+               ["Date", "Description", "Amount", "Balance"]]
+    paths = []
+    for doc in range(docs):
+        day_first = doc % 2 == 1
+        balance = 1000.0 + doc
+        lines = []
+        for i in range(rows):
+            month, day = 1 + i * 12 // rows, 13 + i % 15
+            date = f"{day:02d}/{month:02d}/2024" if day_first else f"{month:02d}/{day:02d}/2024"
+            amount = round(rnd.uniform(1, 500), 2)
+            credit = rnd.random() < 0.3
+            balance += amount if credit else -amount
+            lines.append((date, f"DOC{doc} MERCHANT {i}", amount, credit, round(balance, 2)))
+
+        kind = "txt" if doc % 4 == 3 else "csv"
+        path = os.path.join(directory, f"stress_{doc}.{kind}")
+        with open(path, "w") as f:
+            if kind == "txt":
+                f.write("Statement Period " + ("13/01/2024 - 31/12/2024\n" if day_first else "01/13/2024 - 12/31/2024\n"))
+                for date, desc, amount, credit, bal in lines:
+                    f.write(f"{date} {desc} {'DEPOSIT' if credit else 'PURCHASE'} {amount:,.2f} {bal:,.2f}\n")
+            else:
+                header = layouts[doc % len(layouts)]
+                f.write(",".join(header) + "\n")
+                for date, desc, amount, credit, bal in lines:
+                    values = {"Date": date, "Description": desc, "Balance": f"{bal:.2f}",
+                              "Debit": "" if credit else f"{amount:.2f}", "Credit": f"{amount:.2f}" if credit else "",
+                              "Amount": f"{amount:.2f}" if credit else f"({amount:.2f})"}
+                    f.write(",".join(values[col] for col in header) + "\n")
+        paths.append(path)
+    return paths
+
+
+def _run_fingerprint(pipeline: ETLPipeline, path: str) -> str:
+    """Conversion result minus timings, timestamps and merchant-cache counters (they depend on run order)."""
+    result = None
+    for _, _, res in pipeline.process(path, path.rsplit(".", 1)[1], "csv"):
+        result = res or result
+    stats = {k: v for k, v in result["stats"].items()
+             if k not in ("processing_time_ms", "timestamp", "category_cache")}
+    rows = [{k: v for k, v in tx.items() if k != "metadata"} for tx in result.get("preview_data", [])]
+    return json.dumps({"success": result["success"], "stats": stats, "rows": rows,
+                       "output": result["output_buffer"].getvalue().decode() if result["success"] else None},
+                      sort_keys=True, default=str)
+
+
+def stress_concurrency(threads: int = 8, docs: int = 16, rows: int = 300, rounds: int = 4) -> Dict[str, Any]:
+    """
+    Run many conversions at once on one shared ETLPipeline and compare each
+    with the same document converted alone. The GIL switch interval is
+    shortened meanwhile so threads interleave inside every stage.
+    """
+    pipeline = ETLPipeline()
+    pipeline.cache = None  # Every run must really convert
+    pipeline.results = None
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _write_stress_documents(directory, docs, rows)
+        expected = {path: _run_fingerprint(pipeline, path) for path in paths}
+
+        jobs = paths * rounds
+        random.Random(3).shuffle(jobs)
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(lambda path: _run_fingerprint(pipeline, path), jobs))
+            elapsed = time.perf_counter() - t0
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+    mismatches = sum(result != expected[path] for path, result in zip(jobs, results))
+    return {
+        "benchmark": "concurrency",
+        "threads": threads,
+        "conversions": len(jobs),
+        "rows_per_document": rows,
+        "mismatches": mismatches,
+        "ok": mismatches == 0,
+        "seconds": round(elapsed, 4),
+        "conversions_per_sec": round(len(jobs) / elapsed, 1) if elapsed else None,
+    }
+
+
+def _synthetic_report(rows: int, seed: int = 5) -> tuple:
+    """(transactions, audit_data) shaped like a finished pipeline run."""
+    rnd = random.Random(seed)
+    descriptions = _synthetic_descriptions(rows, seed)
+    categories = ["Food & Dining", "Transport", "Income", "Shopping", "Fees", "Uncategorized"]
+    transactions = []
+    balance = 10000.0
+    for i, description in enumerate(descriptions):
+        amount = round(rnd.uniform(1, 2500), 2)
+        tx_type = "credit" if rnd.random() < 0.3 else "debit"
+        balance = round(balance + (amount if tx_type == "credit" else -amount), 2)
+        transactions.append({
+            "post_date": f"2024-{1 + i * 12 // rows:02d}-{rnd.randint(1, 28):02d}",
+            "description": description, "amount": amount, "tx_type": tx_type,
+            "category": rnd.choice(categories), "balance": balance,
+            "metadata": {"dq_flag": rnd.choice(["CLEAN", "CLEAN", "RECOVERED_TRANSACTION"])}
+        })
+    flagged = [{"row": i + 1, "date": tx["post_date"], "description": tx["description"], "amount": tx["amount"],
+                "flag_type": "DUPLICATE", "reason": f"Duplicate of row {i}"}
+               for i, tx in enumerate(transactions[1::50], 1)]
+    audit_data = {
+        "financials": {"total_debits": 0.0, "total_credits": 0.0, "opening_balance": 10000.0, "closing_balance": balance},
+        "reconciliation": {"expected_closing": balance, "actual_closing": balance, "is_balanced": True, "status": "BALANCED"},
+        "dq_report": {"stats": {"total": rows, "CLEAN": rows}, "flagged_rows": flagged,
+                      "balance_chain": {"rows_checked": rows, "breaks": 0, "is_consistent": True}},
+    }
+    return transactions, audit_data
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_excel_writer(rows: int, write_only: bool) -> Dict[str, Any]:
+    """One xlsx writer on synthetic rows (run in a fresh process for a clean RSS peak)."""
+    transactions, audit_data = _synthetic_report(rows)
+    loader = UniversalLoader(write_only=write_only)
+    loader.generate(transactions[:10], audit_data, "xlsx")  # Import openpyxl before the baseline
+    baseline = _peak_rss_mb()
+    t0 = time.perf_counter()
+    size = len(loader.generate(transactions, audit_data, "xlsx").getvalue())
+    elapsed = time.perf_counter() - t0
+    return {
+        "writer": "write_only" if write_only else "workbook",
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(rows / elapsed) if elapsed else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "peak_rss_growth_mb": round(_peak_rss_mb() - baseline, 1),
+        "bytes": size,
+    }
+
+
+def bench_excel(rows: int = 50000) -> Dict[str, Any]:
+    """Rows/sec and peak RSS of the regular vs the write-only xlsx writer."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    writers = []
+    for writer in ("workbook", "write_only"):
+        child = subprocess.run(
+            [sys.executable, "-m", "etl.bench", "excel", "--rows", str(rows), "--writer", writer],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        writers.append(json.loads(child.stdout.strip().splitlines()[-1]))
+    return {"benchmark": "excel", "rows": rows, "writers": writers}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    lexer = sub.add_parser("lexer", help="raw-text fallback throughput (lines/sec)")
+    lexer.add_argument("--lines", type=int, default=200000, help="synthetic line count")
+    lexer.add_argument("--pdf", help="benchmark on this PDF's extracted text instead")
+    lexer.add_argument("--repeat", type=int, default=3, help="runs; best time is reported")
+
+    categorize = sub.add_parser("categorize", help="categorization throughput with/without the merchant cache")
+    categorize.add_argument("--lines", type=int, default=200000, help="synthetic description count")
+    categorize.add_argument("--pdf", help="benchmark on this PDF's transactions instead")
+    categorize.add_argument("--repeat", type=int, default=3, help="runs; best time is reported")
+
+    concurrency = sub.add_parser("concurrency", help="stress test: concurrent conversions on one pipeline")
+    concurrency.add_argument("--threads", type=int, default=8, help="worker threads")
+    concurrency.add_argument("--docs", type=int, default=16, help="distinct synthetic statements")
+    concurrency.add_argument("--rows", type=int, default=300, help="transactions per statement")
+    concurrency.add_argument("--rounds", type=int, default=4, help="conversions of each statement")
+
+    excel = sub.add_parser("excel", help="xlsx writer throughput and peak RSS, regular vs write-only")
+    excel.add_argument("--rows", type=int, default=50000, help="synthetic transaction count")
+    excel.add_argument("--writer", choices=["workbook", "write_only"], help="run only this writer (in-process)")
+
+    args = parser.parse_args(argv)
+    if args.benchmark == "lexer":
+        result = bench_lexer(args.lines, args.pdf, args.repeat)
+    elif args.benchmark == "categorize":
+        result = bench_categorize(args.lines, args.pdf, args.repeat)
+    elif args.benchmark == "concurrency":
+        result = stress_concurrency(args.threads, args.docs, args.rows, args.rounds)
+    elif args.benchmark == "excel":
+        result = (bench_excel_writer(args.rows, args.writer == "write_only") if args.writer
+                  else bench_excel(args.rows))
+    print(json.dumps(result))
+    if result.get("ok") is False:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Conversion Cache - Content-addressed store of finished conversions.
+
+Entries are keyed by (document_hash, target_format, pipeline version,
+category rules version), so re-uploading the same statement returns the
+stored output and stats without re-running extraction. Bumping
+PIPELINE_VERSION invalidates everything produced by older rules, and an
+account's custom category rules only ever see outputs built with them.
+
+Eviction is LRU bounded by total stored bytes, plus a TTL per entry.
+"""
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+CacheKey = Tuple[str, str, str, str]
+
+
+class ConversionCache:
+    """
+    In-process LRU cache of pipeline results with size and TTL eviction.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 3600):
+        """
+        Args:
+            max_bytes: Upper bound on the summed size of stored entries
+            ttl_seconds: Entries older than this are treated as misses
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(document_hash: str, target_format: str, pipeline_version: str,
+                 rules_version: str = "") -> CacheKey:
+        return (document_hash, target_format.lower(), pipeline_version, rules_version)
+    
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """
+        Return a private copy of the cached result, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["stored_at"] > self.ttl_seconds:
+                self._drop(key)
+                self.evictions += 1
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {
+                "output": entry["output"],
+                "result": copy.deepcopy(entry["result"])
+            }
+    
+    def put(self, key: CacheKey, output: bytes, result: Dict[str, Any]) -> None:
+        """
+        Store the rendered output bytes and the JSON-safe parts of the result.
+        """
+        size = len(output) + len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            
+            self._entries[key] = {
+                "output": output,
+                "result": copy.deepcopy(result),
+                "size": size,
+                "stored_at": time.time()
+            }
+            self.current_bytes += size
+            
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+    
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry["size"]
@@ -6,7 +6,15 @@ No AI/ML dependencies - pure pattern matching for full auditability.
 
 Categories are configurable and traceable in code.
 """
-from typing import Optional
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from .config import Config
+from .keywords import KeywordMatcher
 
 
 # ─────────────────────────────────────────────────────────────
@@ -64,32 +72,116 @@ CATEGORY_RULES = {
 # Valid categories for schema validation
 VALID_CATEGORIES = list(CATEGORY_RULES.keys()) + ["Uncategorized"]
 
+# Per-transaction noise in merchant descriptions: dates (01/15, 01-15-24),
+# store numbers (#1234), masked card suffixes (XXXX1234, *1234, ...1234)
+# and long reference numbers. Short numbers ("microsoft 365") are kept.
+_MERCHANT_NOISE_RE = re.compile(
+    r'(?<![\w])(?:'
+    r'\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?'
+    r'|#\s*\d+'
+    r'|(?:x{2,}|\*+|\.{2,})\d{2,}'
+    r'|\d{4,}'
+    r')(?![\w])'
+)
+
+
+def normalize_merchant(description: str) -> str:
+    """
+    Reduce a transaction description to its merchant key.
+
+    Lower-cases, removes dates, store numbers and card suffixes, and
+    collapses whitespace, so "STARBUCKS #1234 01/15" and "Starbucks #0987"
+    share one key.
+
+    Rules are matched against this key, not the raw description, so the
+    result can differ from a plain substring test: a multi-word keyword also
+    matches across collapsed whitespace or a removed token ("BEST  BUY #123"
+    and "HOME\tDEPOT" are Shopping). Keywords this function would change
+    (a date such as "7-11", a 4+ digit number) cannot occur in a key;
+    CategoryMapper matches those against the raw lower-cased description.
+    """
+    return ' '.join(_MERCHANT_NOISE_RE.sub(' ', description.lower()).split())
+
+
+def merge_rules(overrides: Optional[dict]) -> dict:
+    """
+    Combine per-account rule overrides with the default CATEGORY_RULES.
+    
+    Override categories are checked first, in their own order; a category
+    named in both replaces the default keyword list. Keywords are
+    lower-cased, as matching runs on lower-cased text.
+    
+    Raises:
+        ValueError: overrides is not a {category: [keyword, ...]} mapping
+    """
+    if not overrides:
+        return CATEGORY_RULES
+    if not isinstance(overrides, dict):
+        raise ValueError("category rules must be an object of category -> keyword list")
+    
+    merged = {}
+    for category, keywords in overrides.items():
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError(f"invalid category name: {category!r}")
+        if not isinstance(keywords, list) or not all(isinstance(kw, str) for kw in keywords):
+            raise ValueError(f"keywords for {category!r} must be a list of strings")
+        merged[category.strip()] = [kw.strip().lower() for kw in keywords if kw.strip()]
+    for category, keywords in CATEGORY_RULES.items():
+        merged.setdefault(category, keywords)
+    return merged
+
+
+def rules_version(rules: dict) -> str:
+    """Short content hash of a rule set; rule order is part of the hash (first match wins)."""
+    return hashlib.sha256(json.dumps(rules, separators=(",", ":")).encode()).hexdigest()[:16]
+
 
 class CategoryMapper:
     """
     Deterministic transaction categorizer using keyword matching.
     
+    Descriptions are normalized to a merchant key (normalize_merchant) and
+    the key -> category result is kept in a bounded LRU cache, so repeated
+    merchants skip the rule scan. Callers that want counters for their own
+    lookups (one conversion, say) pass a tally dict; get_cache_stats() covers
+    every lookup since the mapper was created.
+    
     Usage:
         mapper = CategoryMapper()
         category = mapper.categorize("UBER TRIP SAN FRANCISCO")
         # Returns: "Transport"
     """
     
-    def __init__(self, custom_rules: Optional[dict] = None):
+    def __init__(self, custom_rules: Optional[dict] = None, cache_size: int = Config.CATEGORY_CACHE_SIZE):
         """
         Initialize with default rules, optionally override with custom rules.
         
         Args:
             custom_rules: Optional dict to override default CATEGORY_RULES
+            cache_size: Max merchant keys kept in the LRU cache (0 = no cache)
         """
         self.rules = custom_rules if custom_rules else CATEGORY_RULES
+        self.version = rules_version(self.rules)
+        self.matcher = KeywordMatcher(self.rules.items())
+        self.cache_size = cache_size
+        # Keywords the normalizer would rewrite ("7-11", "store #12") never occur
+        # in a merchant key, so they are matched against the raw description
+        raw_groups = [(category, [kw for kw in keywords if normalize_merchant(kw) != kw])
+                      for category, keywords in self.rules.items()]
+        self.raw_matcher = KeywordMatcher(raw_groups) if any(kws for _, kws in raw_groups) else None
+        self._priority = {category: i for i, category in enumerate(self.rules)}
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
     
-    def categorize(self, description: str) -> str:
+    def categorize(self, description: str, tally: Optional[Dict[str, int]] = None) -> str:
         """
         Categorize a transaction based on its description.
         
         Args:
             description: Transaction description text
+            tally: Optional {"hits": n, "misses": n} counters to add this lookup to
             
         Returns:
             Category name (str), defaults to "Uncategorized"
@@ -97,14 +189,88 @@ class CategoryMapper:
         if not description:
             return "Uncategorized"
         
-        desc_lower = description.lower()
+        category = self._match_key(normalize_merchant(description), tally)
+        if self.raw_matcher is not None:
+            # Earlier categories win, whichever text their keyword matched in
+            raw = self.raw_matcher.first(description.lower())
+            if raw is not None and self._priority[raw] < self._priority.get(category, len(self._priority)):
+                category = raw
+        return category
+    
+    def categorize_batch(self, descriptions: Iterable[str], tally: Optional[Dict[str, int]] = None) -> List[str]:
+        """
+        Categorize many descriptions at once.
+        
+        Each distinct description is normalized and matched once; duplicates
+        within the batch reuse that result.
+        """
+        seen: Dict[str, str] = {}
+        categories = []
+        for description in descriptions:
+            category = seen.get(description)
+            if category is None:
+                category = seen[description] = self.categorize(description, tally)
+            categories.append(category)
+        return categories
+    
+    def categorize_column(self, descriptions, tally: Optional[Dict[str, int]] = None):
+        """
+        Categorize a pandas Series of descriptions.
         
-        for category, keywords in self.rules.items():
-            for keyword in keywords:
-                if keyword in desc_lower:
-                    return category
+        Each distinct description is matched once and the result mapped back
+        over the column, so repeated merchants cost a dict lookup.
+        """
+        unique = descriptions.unique()
+        return descriptions.map(dict(zip(unique, self.categorize_batch(unique, tally))))
+    
+    def _match_key(self, key: str, tally: Optional[Dict[str, int]]) -> str:
+        """Category of a merchant key, through the LRU cache."""
+        if not self.cache_size:
+            return self._match(key)
         
-        return "Uncategorized"
+        with self._lock:
+            category = self._cache.get(key)
+            if category is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        hit = category is not None
+        if not hit:
+            # Match outside the lock; a concurrent match of the same key is harmless
+            category = self._match(key)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = category
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        if tally is not None:
+            tally["hits" if hit else "misses"] += 1
+        return category
+    
+    def _match(self, key: str) -> str:
+        return self.matcher.first(key) or "Uncategorized"
+    
+    @staticmethod
+    def new_tally() -> Dict[str, int]:
+        """Empty per-caller counters for categorize(..., tally=...)."""
+        return {"hits": 0, "misses": 0}
+    
+    @staticmethod
+    def tally_stats(tally: Dict[str, int]) -> dict:
+        """Hits, misses and hit rate of a tally."""
+        lookups = tally["hits"] + tally["misses"]
+        return {
+            "hits": tally["hits"],
+            "misses": tally["misses"],
+            "hit_rate": round(tally["hits"] / lookups, 4) if lookups else 0.0,
+        }
+    
+    def get_cache_stats(self) -> dict:
+        """Merchant-key cache counters since this mapper was created."""
+        return {
+            **self.tally_stats({"hits": self.hits, "misses": self.misses}),
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+        }
     
     def get_rules(self) -> dict:
         """Return current categorization rules for transparency/audit."""
@@ -120,7 +286,7 @@ class CategoryMapper:
         Returns:
             Dict with category counts
         """
-        stats = {cat: 0 for cat in VALID_CATEGORIES}
+        stats = {cat: 0 for cat in list(self.rules) + ["Uncategorized"]}
         
         for tx in transactions:
             cat = tx.get("category", "Uncategorized")
@@ -131,3 +297,65 @@ class CategoryMapper:
         
         # Remove zero-count categories for cleaner output
         return {k: v for k, v in stats.items() if v > 0}
+
+
+class _MapperCache:
+    """Compiled CategoryMappers keyed by rule-set version, LRU-bounded."""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._mappers: "OrderedDict[str, CategoryMapper]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.compiles = 0
+    
+    def get(self, rules: dict) -> CategoryMapper:
+        version = rules_version(rules)
+        with self._lock:
+            mapper = self._mappers.get(version)
+            if mapper is not None:
+                self._mappers.move_to_end(version)
+                self.hits += 1
+                return mapper
+        
+        # Compile outside the lock; a concurrent compile of the same rules is harmless
+        mapper = CategoryMapper(rules)
+        with self._lock:
+            self.compiles += 1
+            self._mappers[version] = mapper
+            while len(self._mappers) > self.max_entries:
+                self._mappers.popitem(last=False)
+        return mapper
+    
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._mappers),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "compiles": self.compiles,
+        }
+
+
+_MAPPERS = _MapperCache(max(Config.CATEGORY_RULESET_CACHE_SIZE, 1))
+
+
+def get_category_mapper(overrides: Optional[dict] = None) -> CategoryMapper:
+    """
+    Shared CategoryMapper for the default rules plus optional account overrides.
+    
+    Each distinct rule set is compiled once per process and reused until it
+    is evicted; editing the rules changes their version hash, so the next
+    request compiles the new set. Malformed overrides are logged and the
+    default rules are used.
+    """
+    try:
+        rules = merge_rules(overrides)
+    except ValueError as e:
+        logging.warning(f"Ignoring custom category rules: {e}")
+        rules = CATEGORY_RULES
+    return _MAPPERS.get(rules)
+
+
+def get_ruleset_cache_stats() -> dict:
+    """Occupancy and hit/compile counters of the compiled rule-set cache."""
+    return _MAPPERS.get_stats()
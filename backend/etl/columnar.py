@@ -0,0 +1,113 @@
+"""
+Columnar Transaction Batches - whole-column view of a list of Transactions.
+
+The row representation (list of Transaction dicts, each with its own nested
+metadata dict) stays the public contract. TransactionBatch holds the same
+fields as flat pandas columns so the batch-native stage methods
+(TransactionFilter.split_batch, CategoryMapper.categorize_column,
+DataQualityEngine.assess_batch, UniversalLoader.generate) can work on whole
+columns instead of per-row dict lookups.
+"""
+from typing import List, Dict, Any, Iterable, Optional, TYPE_CHECKING
+from .schema import Transaction
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Top-level Transaction fields followed by the flattened metadata fields
+TX_COLUMNS = ["post_date", "description", "amount", "tx_type", "category", "balance"]
+META_COLUMNS = ["source_file_id", "extraction_method", "dq_flag", "processing_timestamp", "is_eligible"]
+COLUMNS = TX_COLUMNS + META_COLUMNS
+
+
+class TransactionBatch:
+    """
+    Columnar batch of transactions backed by a pandas DataFrame.
+
+    Supports len() and integer indexing (returning a Transaction dict) so
+    code that only peeks at the first/last row works with either form.
+    """
+
+    def __init__(self, frame: Optional["pd.DataFrame"] = None):
+        if frame is None:
+            import pandas as pd
+            frame = pd.DataFrame(columns=COLUMNS)
+        self.frame = frame
+
+    @classmethod
+    def from_rows(cls, rows: List[Transaction]) -> "TransactionBatch":
+        """Build a batch from Transaction dicts (one pass, column by column)."""
+        import pandas as pd
+        data: Dict[str, List[Any]] = {col: [] for col in COLUMNS}
+        for tx in rows:
+            meta = tx.get("metadata") or {}
+            data["post_date"].append(tx.get("post_date", ""))
+            data["description"].append(tx.get("description", "") or "")
+            data["amount"].append(tx.get("amount", 0.0) or 0.0)
+            data["tx_type"].append(tx.get("tx_type", ""))
+            data["category"].append(tx.get("category", "Uncategorized"))
+            data["balance"].append(tx.get("balance"))
+            data["source_file_id"].append(meta.get("source_file_id", ""))
+            data["extraction_method"].append(meta.get("extraction_method", "unknown"))
+            data["dq_flag"].append(meta.get("dq_flag", "unknown"))
+            data["processing_timestamp"].append(meta.get("processing_timestamp", ""))
+            data["is_eligible"].append(meta.get("is_eligible", True))
+
+        frame = pd.DataFrame(data, columns=COLUMNS)
+        frame["amount"] = frame["amount"].astype(float)
+        frame["balance"] = frame["balance"].astype(object)
+        frame["is_eligible"] = frame["is_eligible"].astype(bool)
+        return cls(frame)
+
+    @classmethod
+    def concat(cls, batches: Iterable["TransactionBatch"]) -> "TransactionBatch":
+        """Concatenate batches in order (e.g. one per page)."""
+        import pandas as pd
+        frames = [b.frame for b in batches if len(b)]
+        if not frames:
+            return cls()
+        return cls(pd.concat(frames, ignore_index=True))
+
+    def take(self, mask) -> "TransactionBatch":
+        """Rows where mask is True, as a new batch with a fresh index."""
+        import numpy as np
+        return TransactionBatch(self.frame[np.asarray(mask, dtype=bool)].reset_index(drop=True))
+
+    def column(self, name: str) -> "pd.Series":
+        return self.frame[name]
+
+    def to_rows(self) -> List[Transaction]:
+        """Materialize back into Transaction dicts (for JSON previews/caching)."""
+        return [self._row(values) for values in zip(*(self.frame[col].tolist() for col in COLUMNS))]
+
+    def to_arrow(self):
+        """Arrow table of the batch (requires pyarrow)."""
+        import pyarrow as pa
+        return pa.Table.from_pandas(self.frame, preserve_index=False)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __getitem__(self, idx: int) -> Transaction:
+        return self._row(self.frame.iloc[idx][COLUMNS].tolist())
+
+    @staticmethod
+    def _row(values: List[Any]) -> Transaction:
+        (post_date, description, amount, tx_type, category, balance,
+         source_file_id, extraction_method, dq_flag, timestamp, is_eligible) = values
+        return {
+            "post_date": post_date,
+            "description": description,
+            "amount": float(amount),
+            "tx_type": tx_type,
+            "category": category,
+            "balance": None if balance is None or balance != balance else float(balance),
+            "metadata": {
+                "source_file_id": source_file_id,
+                "extraction_method": extraction_method,
+                "dq_flag": dq_flag,
+                "processing_timestamp": timestamp,
+                "is_eligible": bool(is_eligible)
+            }
+        }
@@ -1,3 +1,5 @@
+import os
+
 
 # ETL Configuration
 class Config:
@@ -6,3 +8,50 @@ class Config:
     UPLOAD_FOLDER = "uploads"
     OUTPUT_FOLDER = "outputs"
     ALLOWED_EXTENSIONS = {'pdf', 'csv', 'txt'}
+
+    # Parallel PDF extraction (0 = serial, the default)
+    PDF_WORKERS = int(os.environ.get("PDF_WORKERS", 0))
+    PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", 8))
+    # One word-layout pass per page shared by table and text extraction
+    PDF_SHARED_LAYOUT = os.environ.get("PDF_SHARED_LAYOUT", "false").lower() == "true"
+    # Skip the table finder on pages with no rulings or no dates/headers
+    PDF_TABLE_PRESCREEN = os.environ.get("PDF_TABLE_PRESCREEN", "true").lower() == "true"
+    # Learned bank layouts: matching pages are bucketed by x-coordinate
+    LAYOUT_REGISTRY_ENABLED = os.environ.get("LAYOUT_REGISTRY_ENABLED", "false").lower() == "true"
+    LAYOUT_REGISTRY_PATH = os.environ.get("LAYOUT_REGISTRY_PATH")  # None = in-memory only
+    LAYOUT_MIN_CONFIDENCE = float(os.environ.get("LAYOUT_MIN_CONFIDENCE", 0.8))
+    # Carry transactions between Filter/Categorize/DQ/Load as columnar batches
+    COLUMNAR_BATCHES = os.environ.get("COLUMNAR_BATCHES", "false").lower() == "true"
+    # Normalized merchant -> category LRU entries per CategoryMapper
+    CATEGORY_CACHE_SIZE = int(os.environ.get("CATEGORY_CACHE_SIZE", 4096))
+    # Compiled per-account category rule sets kept in process
+    CATEGORY_RULESET_CACHE_SIZE = int(os.environ.get("CATEGORY_RULESET_CACHE_SIZE", 256))
+    # Near-duplicate transactions: same amount and direction, posted within N days,
+    # descriptions at least this similar (1.0 = exact duplicates only).
+    # Only same-day matches are flagged DUPLICATE; the rest are POSSIBLE_DUPLICATE
+    DUPLICATE_DATE_WINDOW_DAYS = int(os.environ.get("DUPLICATE_DATE_WINDOW_DAYS", 1))
+    DUPLICATE_MIN_SIMILARITY = float(os.environ.get("DUPLICATE_MIN_SIMILARITY", 0.85))
+    # Stream xlsx output through a write-only workbook (constant memory per row)
+    EXCEL_WRITE_ONLY = os.environ.get("EXCEL_WRITE_ONLY", "true").lower() == "true"
+    # Write-only sheets size their columns from this many leading rows
+    EXCEL_WIDTH_SAMPLE_ROWS = int(os.environ.get("EXCEL_WIDTH_SAMPLE_ROWS", 2000))
+    # Rows encoded per chunk by the streaming CSV / NDJSON writers
+    EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", 1000))
+
+    # Conversion cache (keyed by document hash + target format + pipeline version)
+    CONVERSION_CACHE_ENABLED = os.environ.get("CONVERSION_CACHE_ENABLED", "true").lower() == "true"
+    CONVERSION_CACHE_MAX_MB = int(os.environ.get("CONVERSION_CACHE_MAX_MB", 64))
+    CONVERSION_CACHE_TTL_SECONDS = int(os.environ.get("CONVERSION_CACHE_TTL_SECONDS", 3600))
+
+    # Canonical results (transactions + audit data) kept on disk so /download can
+    # render other formats later without re-running extraction
+    RESULT_STORE_ENABLED = os.environ.get("RESULT_STORE_ENABLED", "true").lower() == "true"
+    RESULT_STORE_DIR = os.environ.get("RESULT_STORE_DIR", os.path.join("outputs", "results"))
+    RESULT_STORE_TTL_SECONDS = int(os.environ.get("RESULT_STORE_TTL_SECONDS", 86400))
+    # Expired results are swept from RESULT_STORE_DIR at most this often (on save)
+    RESULT_STORE_SWEEP_SECONDS = int(os.environ.get("RESULT_STORE_SWEEP_SECONDS", 3600))
+
+    # Warm start: formats whose parsers/writers are pre-imported by etl.warmup ("" = skip)
+    WARMUP_FORMATS = [f.strip() for f in os.environ.get("WARMUP_FORMATS", "pdf,csv,xlsx").split(",") if f.strip()]
+    # Startup import time above this is logged as a warning
+    STARTUP_BUDGET_MS = int(os.environ.get("STARTUP_BUDGET_MS", 2000))
@@ -0,0 +1,201 @@
+"""
+Date Normalizer - Statement-level date format inference and ISO output.
+
+Statement dates arrive as whatever text the extractor matched ("1/5",
+"01-05-2024", "Jan 5"). The format is a property of the statement, not of
+each row, so it is inferred once per document:
+
+- day/month order from a sample of dates (a component above 12 settles it;
+  US month-first is the default when nothing does)
+- the year for year-less dates from the statement period ("Statement
+  Period 12/01/2023 - 01/05/2024", "Statement Date: June 5, 2003",
+  "Beginning Balance on May 3, 2003"), else from dates that carry a year
+
+Every distinct raw string is then parsed once (memoized) and emitted as an
+ISO 8601 date (YYYY-MM-DD). Strings that are not valid dates are kept as-is.
+"""
+import re
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+_MONTH = r'\b(?P<mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+ISO_RE = re.compile(r'(?P<y>\d{4})[/-](?P<a>\d{1,2})[/-](?P<b>\d{1,2})')
+NUMERIC_RE = re.compile(r'(?<!\d)(?P<a>\d{1,2})[/.-](?P<b>\d{1,2})(?:[/.-](?P<y>\d{4}|\d{2}))?(?!\d)')
+ALPHA_RE = re.compile(_MONTH + r'\s+(?P<d>\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(?P<y>\d{4}|\d{2}))?(?!\d)', re.I)
+ALPHA_DAY_FIRST_RE = re.compile(r'(?<!\d)(?P<d>\d{1,2})\s+' + _MONTH + r'(?:,?\s+(?P<y>\d{4}|\d{2}))?(?!\d)', re.I)
+
+_DATE_TEXT = r'(\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}|[a-z]{3,9}\.?\s+\d{1,2},?\s+\d{4}|\d{1,2}\s+[a-z]{3,9}\.?\s+\d{4})'
+PERIOD_RE = re.compile(
+    r'(?:statement\s+period|period|statement\s+dates?|from)\s*:?\s*' + _DATE_TEXT +
+    r'\s*(?:-|–|to|through|thru)\s*' + _DATE_TEXT, re.I)
+PERIOD_START_RE = re.compile(r'(?:beginning|opening|previous)\s+balance\s+(?:on|as\s+of)\s*:?\s*' + _DATE_TEXT, re.I)
+PERIOD_END_RE = re.compile(
+    r'(?:(?:ending|closing)\s+balance\s+(?:on|as\s+of)|statement\s+date|closing\s+date)\s*:?\s*' + _DATE_TEXT, re.I)
+
+# (year or None, first numeric component, second numeric component) / (year, month, day)
+_Parts = Tuple[Optional[int], int, int]
+
+
+def _full_year(y: Optional[str]) -> Optional[int]:
+    if not y:
+        return None
+    year = int(y)
+    return year + 2000 if year < 100 else year
+
+
+def _split(raw: str) -> Tuple[str, Optional[_Parts]]:
+    """
+    Tokenize a date string.
+
+    Returns:
+        (kind, parts): kind is 'iso' / 'alpha' (parts are year, month, day)
+        or 'numeric' (parts are year, first, second with order unknown);
+        ('', None) when no date is found
+    """
+    m = ISO_RE.search(raw)
+    if m:
+        return 'iso', (int(m.group('y')), int(m.group('a')), int(m.group('b')))
+    m = NUMERIC_RE.search(raw)
+    if m:
+        return 'numeric', (_full_year(m.group('y')), int(m.group('a')), int(m.group('b')))
+    m = ALPHA_RE.search(raw) or ALPHA_DAY_FIRST_RE.search(raw)
+    if m:
+        return 'alpha', (_full_year(m.group('y')), MONTHS[m.group('mon')[:3].lower()], int(m.group('d')))
+    return '', None
+
+
+class DateNormalizer:
+    """
+    Per-statement date parser with inferred format and memoized results.
+
+    Usage:
+        normalizer = DateNormalizer()
+        normalizer.observe_text(first_page_text)    # picks up the statement period
+        normalizer.infer(tx["post_date"] for tx in sample)
+        normalizer.normalize("1/5")                  # "2024-01-05"
+    """
+
+    def __init__(self, day_first: Optional[bool] = None, default_year: Optional[int] = None):
+        """
+        Args:
+            day_first: Force DD/MM (True) or MM/DD (False) instead of inferring
+            default_year: Year for year-less dates when no period or sample year is found
+                          (default: the current year)
+        """
+        self.day_first = day_first
+        self.default_year = default_year or datetime.now().year
+        self.period_text: Dict[str, str] = {}  # 'start' / 'end' -> raw date text
+        self.period_start: Optional[date] = None
+        self.period_end: Optional[date] = None
+        self.sample_year: Optional[int] = None
+        self._memo: Dict[str, str] = {}
+        self.parsed = 0
+        self.unparsed = 0
+
+    def observe_text(self, text: str) -> bool:
+        """Record the first statement period bounds found in text; True once both are known."""
+        if not text or len(self.period_text) == 2:
+            return len(self.period_text) == 2
+        m = PERIOD_RE.search(text)
+        if m:
+            self.period_text = {"start": m.group(1), "end": m.group(2)}
+            return True
+        for bound, pattern in (("start", PERIOD_START_RE), ("end", PERIOD_END_RE)):
+            if bound not in self.period_text:
+                m = pattern.search(text)
+                if m:
+                    self.period_text[bound] = m.group(1)
+        return len(self.period_text) == 2
+
+    def infer(self, samples: Iterable[str]) -> None:
+        """
+        Settle day/month order and the fallback year from sample date strings
+        (and the statement period seen by observe_text). Clears the memo.
+        """
+        day_first_votes = month_first_votes = 0
+        years: Counter = Counter()
+        for raw in samples:
+            kind, parts = _split(str(raw or ""))
+            if parts is None:
+                continue
+            year, a, b = parts
+            if year:
+                years[year] += 1
+            if kind == 'numeric':
+                if a > 12 >= b:
+                    day_first_votes += 1
+                elif b > 12 >= a:
+                    month_first_votes += 1
+
+        if self.day_first is None:
+            self.day_first = day_first_votes > month_first_votes
+        if years:
+            self.sample_year = years.most_common(1)[0][0]
+
+        start, end = (self._to_date(*_split(self.period_text[b])) if b in self.period_text else None
+                      for b in ("start", "end"))
+        if start and end and start > end:
+            start = end = None
+        self.period_start, self.period_end = start, end
+        self._memo.clear()
+
+    def normalize(self, raw: str) -> str:
+        """ISO date for raw, or raw unchanged when it is not a valid date."""
+        result = self._memo.get(raw)
+        if result is None:
+            parsed = self._to_date(*_split(str(raw or "")))
+            if parsed is None:
+                self.unparsed += 1
+                result = raw
+            else:
+                self.parsed += 1
+                result = parsed.isoformat()
+            self._memo[raw] = result
+        return result
+
+    def normalize_column(self, dates):
+        """Normalize a pandas Series of date strings; each distinct string is parsed once."""
+        unique = dates.unique()
+        return dates.map(dict(zip(unique, map(self.normalize, unique))))
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "order": "DMY" if self.day_first else "MDY",
+            "period": [d.isoformat() if d else None for d in (self.period_start, self.period_end)],
+            "year_source": "period" if (self.period_start or self.period_end)
+                           else ("sample" if self.sample_year else "default"),
+            "distinct": len(self._memo),
+            "parsed": self.parsed,
+            "unparsed": self.unparsed,
+        }
+
+    def _to_date(self, kind: str, parts: Optional[_Parts]) -> Optional[date]:
+        if parts is None:
+            return None
+        year, month, day = parts
+        if kind == 'numeric' and self.day_first:
+            month, day = day, month
+        if year is None:
+            year = self._year_for(month)
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    def _year_for(self, month: int) -> int:
+        """
+        Year of a year-less date: the year that places it inside the statement
+        period (after its start / not after its end), else the sample/default year.
+        """
+        start, end = self.period_start, self.period_end
+        if end is not None:
+            if start is not None and start.year != end.year:
+                return start.year if month >= start.month else end.year
+            return end.year if month <= end.month else end.year - 1
+        if start is not None:
+            return start.year if month >= start.month else start.year + 1
+        return self.sample_year or self.default_year
@@ -7,15 +7,33 @@ DQ Classification:
 - SUSPECT: Missing required fields (true anomaly)
 - NON_TRANSACTION: Summary/metadata row
 
+Reconciliation checks the statement totals (opening + credits - debits vs
+closing) and the running-balance chain row by row, so a failing statement
+points at the rows where a transaction is missing or misread.
+
+Duplicates are found by DuplicateDetector: same amount and direction within
+a short date window and (near-)identical descriptions, so a charge listed
+twice with a slightly different description text is flagged as well.
+Same-day matches are flagged DUPLICATE; matches on different days are only
+POSSIBLE_DUPLICATE, as recurring charges look the same.
+
 All logic is rule-based and fully traceable.
 """
 from typing import List, Dict, Any, Optional
 from .schema import Transaction
+from .columnar import TransactionBatch
+from .money import column_cents, sum_cents, to_cents
+from .duplicates import Duplicate, DuplicateDetector
 
 
 # Valid DQ flags
 DQ_FLAGS = ["CLEAN", "RECOVERED_TRANSACTION", "SUSPECT", "NON_TRANSACTION"]
 
+# Balances within this many cents count as matching
+BALANCE_TOLERANCE_CENTS = 1
+# Break rows listed in the report / flagged; the count is always exact
+MAX_BALANCE_BREAKS = 100
+
 
 class DataQualityEngine:
     """
@@ -23,7 +41,8 @@ class DataQualityEngine:
     No ML, no AI - rule-based quality assessment for full auditability.
     """
     
-    def __init__(self):
+    def __init__(self, duplicate_detector: Optional[DuplicateDetector] = None):
+        self.duplicate_detector = duplicate_detector or DuplicateDetector()
         self.stats = {
             "total": 0,
             "CLEAN": 0,
@@ -33,6 +52,8 @@ class DataQualityEngine:
         }
         self.flagged_rows: List[Dict[str, Any]] = []
         self.reconciliation: Dict[str, Any] = {}
+        self.balance_chain: Dict[str, Any] = {}
+        self.duplicates: Dict[int, Duplicate] = {}
         self.statement_metadata: Dict[str, Any] = {}
     
     def assess(self, transactions: List[Transaction], 
@@ -44,25 +65,26 @@ class DataQualityEngine:
         """
         self.stats = {"total": 0, "CLEAN": 0, "RECOVERED_TRANSACTION": 0, "SUSPECT": 0, "NON_TRANSACTION": 0}
         self.flagged_rows = []
+        self.balance_chain = {}
         self.statement_metadata = extracted_metadata or {}
         
         # Count non-transaction rows
         if metadata_rows:
             self.stats["NON_TRANSACTION"] = len(metadata_rows)
         
-        seen_signatures: Dict[str, int] = {}
+        self._find_duplicates(
+            dates=[tx.get("post_date", "") for tx in transactions],
+            amounts=[tx.get("amount", 0.0) for tx in transactions],
+            descriptions=[tx.get("description", "") for tx in transactions],
+            tx_types=[tx.get("tx_type", "") for tx in transactions]
+        )
         
         for idx, tx in enumerate(transactions):
             self.stats["total"] += 1
             row_num = idx + 1
             
-            sig = self._get_signature(tx)
-            is_duplicate = sig in seen_signatures
-            if is_duplicate:
-                prev_row = seen_signatures[sig]
-                self._add_flag(row_num, tx, "DUPLICATE", f"Duplicate of row {prev_row}")
-            else:
-                seen_signatures[sig] = row_num
+            if idx in self.duplicates:
+                self._flag_duplicate(row_num, tx, self.duplicates[idx])
             
             # Calculate DQ flag
             dq_flag = self._calculate_dq(tx)
@@ -73,10 +95,95 @@ class DataQualityEngine:
                 self._add_flag(row_num, tx, "FORMAT_ISSUE", "Missing required fields")
         
         self._check_reconciliation(transactions, extracted_metadata)
+        self._check_running_balance(
+            amounts=[tx.get("amount", 0.0) for tx in transactions],
+            tx_types=[tx.get("tx_type", "") for tx in transactions],
+            balances=[tx.get("balance") for tx in transactions],
+            eligible=[tx.get("metadata", {}).get("is_eligible", True) for tx in transactions],
+            row_at=transactions.__getitem__
+        )
         return transactions
     
-    def _get_signature(self, tx: Transaction) -> str:
-        return f"{tx.get('post_date')}|{tx.get('amount')}|{tx.get('description', '')[:30]}"
+    def assess_batch(self, batch: TransactionBatch, metadata_count: int = 0,
+                     extracted_metadata: Dict[str, Any] = None) -> TransactionBatch:
+        """
+        Columnar assess(): DQ flags, duplicate detection and reconciliation
+        computed on whole columns. Produces the same stats/flags as assess().
+        """
+        import numpy as np
+        import pandas as pd
+        
+        self.stats = {"total": len(batch), "CLEAN": 0, "RECOVERED_TRANSACTION": 0, "SUSPECT": 0, "NON_TRANSACTION": 0}
+        self.flagged_rows = []
+        self.balance_chain = {}
+        self.statement_metadata = extracted_metadata or {}
+        if metadata_count:
+            self.stats["NON_TRANSACTION"] = metadata_count
+        
+        frame = batch.frame
+        eligible = frame["is_eligible"].to_numpy(dtype=bool)
+        is_complete = (frame["post_date"].fillna("").astype(bool).to_numpy()
+                       & frame["description"].fillna("").astype(bool).to_numpy()
+                       & (frame["amount"] > 0).to_numpy())
+        dq_flags = np.select(
+            [~eligible, ~is_complete, (frame["extraction_method"] == "table").to_numpy()],
+            ["NON_TRANSACTION", "SUSPECT", "CLEAN"],
+            default="RECOVERED_TRANSACTION"
+        )
+        frame["dq_flag"] = dq_flags
+        flags, counts = np.unique(dq_flags, return_counts=True)
+        for flag, count in zip(flags, counts):
+            self.stats[flag] = self.stats.get(flag, 0) + int(count)
+        
+        self._find_duplicates(
+            dates=frame["post_date"].fillna("").tolist(),
+            amounts=frame["amount"].tolist(),
+            descriptions=frame["description"].fillna("").tolist(),
+            tx_types=frame["tx_type"].tolist()
+        )
+        is_duplicate = np.zeros(len(frame), dtype=bool)
+        is_duplicate[list(self.duplicates)] = True
+        is_suspect = dq_flags == "SUSPECT"
+        
+        for idx in np.flatnonzero(is_duplicate | is_suspect):
+            tx = batch[int(idx)]
+            if is_duplicate[idx]:
+                self._flag_duplicate(int(idx) + 1, tx, self.duplicates[int(idx)])
+            if is_suspect[idx]:
+                self._add_flag(int(idx) + 1, tx, "FORMAT_ISSUE", "Missing required fields")
+        
+        cents = column_cents(frame["amount"])
+        tx_types = frame["tx_type"].to_numpy()
+        self._reconcile(
+            credit_cents=int(cents[eligible & (tx_types == "credit")].sum()),
+            debit_cents=int(cents[eligible & (tx_types == "debit")].sum()),
+            extracted_metadata=extracted_metadata,
+            last_tx=batch[len(batch) - 1] if len(batch) else None
+        )
+        self._check_running_balance(
+            amounts=frame["amount"],
+            tx_types=tx_types,
+            balances=pd.to_numeric(frame["balance"], errors="coerce"),
+            eligible=eligible,
+            row_at=batch.__getitem__
+        )
+        return batch
+    
+    def _find_duplicates(self, dates, amounts, descriptions, tx_types) -> None:
+        self.duplicates = {dup.row: dup for dup in self.duplicate_detector.find(dates, amounts, descriptions, tx_types)}
+    
+    def _flag_duplicate(self, row_num: int, tx: Transaction, dup: Duplicate) -> None:
+        if dup.days_apart:
+            days = "1 day" if dup.days_apart == 1 else f"{dup.days_apart} days"
+            reason = f"Possible duplicate of row {dup.duplicate_of + 1}, {days} apart"
+            if dup.similarity != 1.0:
+                reason += f" (similarity {dup.similarity:.2f})"
+            self._add_flag(row_num, tx, "POSSIBLE_DUPLICATE", reason)
+        elif dup.similarity == 1.0:
+            self._add_flag(row_num, tx, "DUPLICATE", f"Duplicate of row {dup.duplicate_of + 1}")
+        else:
+            self._add_flag(row_num, tx, "DUPLICATE",
+                           f"Near-duplicate of row {dup.duplicate_of + 1} (similarity {dup.similarity:.2f})")
     
     def _add_flag(self, row_num: int, tx: Transaction, flag_type: str, reason: str) -> None:
         self.flagged_rows.append({
@@ -110,23 +217,27 @@ class DataQualityEngine:
     
     def _check_reconciliation(self, transactions: List[Transaction], 
                                extracted_metadata: Dict[str, Any] = None) -> None:
+        eligible = [tx for tx in transactions if tx.get("metadata", {}).get("is_eligible", True)]
+        credit_cents = sum_cents(tx.get("amount", 0.0) for tx in eligible if tx.get("tx_type") == "credit")
+        debit_cents = sum_cents(tx.get("amount", 0.0) for tx in eligible if tx.get("tx_type") == "debit")
+        
+        self._reconcile(credit_cents, debit_cents, extracted_metadata,
+                        transactions[-1] if transactions else None)
+    
+    def _reconcile(self, credit_cents: int, debit_cents: int,
+                   extracted_metadata: Dict[str, Any] = None,
+                   last_tx: Optional[Transaction] = None) -> None:
+        """Balance check in integer cents; balanced when within 1 cent."""
         meta = extracted_metadata or {}
         opening_balance = meta.get("opening_balance", 0.0)
         closing_balance = meta.get("closing_balance", 0.0)
+        total_credits, total_debits = credit_cents / 100, debit_cents / 100
         
-        total_credits = 0.0
-        total_debits = 0.0
-        
-        for tx in transactions:
-            if tx.get("metadata", {}).get("is_eligible", True):
-                tx_type = tx.get("tx_type", "")
-                amount = tx.get("amount", 0.0)
-                if tx_type == "credit": total_credits += amount
-                elif tx_type == "debit": total_debits += amount
-        
-        expected_closing = opening_balance + total_credits - total_debits
-        delta = abs(expected_closing - closing_balance)
-        is_balanced = delta < 0.02
+        expected_cents = to_cents(opening_balance) + credit_cents - debit_cents
+        delta_cents = abs(expected_cents - to_cents(closing_balance))
+        expected_closing = expected_cents / 100
+        delta = delta_cents / 100
+        is_balanced = delta_cents <= BALANCE_TOLERANCE_CENTS
         
         if not is_balanced:
             if opening_balance == 0 and closing_balance == 0:
@@ -142,16 +253,87 @@ class DataQualityEngine:
             "opening_balance": opening_balance,
             "total_credits": total_credits,
             "total_debits": total_debits,
-            "expected_closing": round(expected_closing, 2),
+            "expected_closing": expected_closing,
             "actual_closing": closing_balance,
-            "delta": round(delta, 2),
+            "delta": delta,
             "is_balanced": is_balanced,
             "status": "✅ Balanced" if is_balanced else f"⚠️ Mismatch (${delta:.2f})",
             "failure_reason": failure_reason
         }
         
-        if not is_balanced and len(transactions) > 0:
-            self._add_flag(0, transactions[-1], "IMBALANCE", failure_reason or f"Reconciliation mismatch: ${delta:.2f}")
+        if not is_balanced and last_tx is not None:
+            self._add_flag(0, last_tx, "IMBALANCE", failure_reason or f"Reconciliation mismatch: ${delta:.2f}")
+    
+    def _check_running_balance(self, amounts, tx_types, balances, eligible, row_at) -> None:
+        """
+        Validate the per-row balance column against the amounts, in one pass.
+        
+        R = printed balance - cumulative signed amount is constant along an
+        unbroken chain, so each change in R between consecutive rows that
+        print a balance is a break, with the change as its gap. Gaps are
+        independent: one missing transaction is one break, not a shift of
+        every later row. The opening balance anchors the first row when the
+        statement states one.
+        
+        Statements list rows oldest- or newest-first, and card statements
+        grow the balance with debits; the orientation with the fewest breaks
+        is used.
+        """
+        import numpy as np
+        
+        cents = column_cents(amounts)
+        tx_types = np.asarray(tx_types, dtype=object)
+        balances = np.asarray(balances, dtype=float)
+        eligible = np.asarray(eligible, dtype=bool)
+        signed = np.where(tx_types == "credit", cents, np.where(tx_types == "debit", -cents, 0)) * eligible
+        checked = np.flatnonzero(eligible & ~np.isnan(balances))
+        opening = to_cents(self.statement_metadata.get("opening_balance") or 0.0)
+        
+        self.balance_chain = {"rows_checked": int(len(checked)), "breaks": 0, "break_rows": [],
+                              "is_consistent": True, "orientation": None}
+        if len(checked) < 2:
+            self.balance_chain["is_consistent"] = None  # Not enough balances to check
+            return
+        
+        printed = column_cents(balances[checked])
+        best = None
+        for order in ("ascending", "descending"):
+            for direction, sign in (("credit_increases", 1), ("debit_increases", -1)):
+                if order == "ascending":
+                    running = np.cumsum(sign * signed)[checked]
+                    rows, residual = checked, printed - running
+                else:
+                    # Newest-first: walk the rows backwards so the oldest comes first
+                    running = np.cumsum((sign * signed)[::-1])[::-1][checked]
+                    rows, residual = checked[::-1], (printed - running)[::-1]
+                gaps = np.diff(residual, prepend=opening if opening else residual[0])
+                breaks = np.flatnonzero(np.abs(gaps) > BALANCE_TOLERANCE_CENTS)
+                if best is None or len(breaks) < len(best[2]):
+                    best = (f"{order}/{direction}", rows, breaks, gaps, residual)
+        
+        orientation, rows, breaks, gaps, residual = best
+        break_rows = []
+        for pos in breaks[:MAX_BALANCE_BREAKS]:
+            idx, gap = int(rows[pos]), int(gaps[pos])
+            actual = int(printed[np.searchsorted(checked, idx)])
+            tx = row_at(idx)
+            break_rows.append({
+                "row": idx + 1,
+                "date": tx.get("post_date", ""),
+                "description": tx.get("description", "")[:50],
+                "expected_balance": (actual - gap) / 100,
+                "actual_balance": actual / 100,
+                "gap": gap / 100
+            })
+            self._add_flag(idx + 1, tx, "BALANCE_BREAK",
+                           f"Running balance off by ${gap / 100:,.2f} (expected {(actual - gap) / 100:,.2f})")
+        
+        self.balance_chain.update({
+            "breaks": int(len(breaks)),
+            "break_rows": break_rows,
+            "is_consistent": not len(breaks),
+            "orientation": orientation
+        })
     
     def get_stats(self) -> Dict[str, Any]:
         return self.stats.copy()
@@ -162,10 +344,26 @@ class DataQualityEngine:
     def get_reconciliation(self) -> Dict[str, Any]:
         return self.reconciliation.copy()
     
+    def get_balance_chain(self) -> Dict[str, Any]:
+        return self.balance_chain.copy()
+    
+    def get_duplicate_stats(self) -> Dict[str, int]:
+        """Same-day duplicates (count = exact + near) and different-day possible duplicates."""
+        same_day = [dup for dup in self.duplicates.values() if not dup.days_apart]
+        exact = sum(1 for dup in same_day if dup.similarity == 1.0)
+        return {
+            "count": len(same_day),
+            "exact": exact,
+            "near": len(same_day) - exact,
+            "possible": len(self.duplicates) - len(same_day)
+        }
+    
     def get_full_report(self) -> Dict[str, Any]:
         return {
             "stats": self.get_stats(),
             "reconciliation": self.get_reconciliation(),
+            "balance_chain": self.get_balance_chain(),
+            "duplicates": self.get_duplicate_stats(),
             "flagged_rows": self.get_flagged_rows(),
             "summary": {
                 "eligible_count": self.stats["CLEAN"] + self.stats["RECOVERED_TRANSACTION"] + self.stats["SUSPECT"],
@@ -174,7 +372,8 @@ class DataQualityEngine:
                 "recovered_count": self.stats["RECOVERED_TRANSACTION"],
                 "suspect_count": self.stats["SUSPECT"],
                 "total_flags": len(self.flagged_rows),
-                "has_duplicates": any(f["flag_type"] == "DUPLICATE" for f in self.flagged_rows),
-                "has_imbalance": not self.reconciliation.get("is_balanced", True)
+                "has_duplicates": any(not dup.days_apart for dup in self.duplicates.values()),
+                "has_imbalance": not self.reconciliation.get("is_balanced", True),
+                "balance_breaks": self.balance_chain.get("breaks", 0)
             }
         }
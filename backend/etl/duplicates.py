@@ -0,0 +1,146 @@
+"""
+Duplicate Detector - Blocking-index near-duplicate search over transactions.
+
+Two rows are duplicates when they move the same amount in the same
+direction within a few days and their descriptions are (nearly) the same.
+Rows are bucketed by (amount in cents, tx_type) and sorted by date, so
+each row is only compared with the rows of its bucket inside the date
+window: O(n log n) for the sort plus a bounded number of cheap comparisons,
+instead of all pairs.
+
+Description similarity is exact equality after lower-casing and collapsing
+whitespace, else a difflib ratio (guarded by its quick upper bounds).
+Descriptions whose numbers differ ("CHECK 1043" / "CHECK 1044") are never
+duplicates.
+
+Each match carries the days between the two postings. Only a same-day
+match is a likely duplicate; one a day or more apart may just as well be a
+recurring charge (subscription, commute fare), and the DQ engine reports it
+at a lower severity.
+
+find_in_statements() runs the same search over several statements at once,
+e.g. to catch a transaction that appears on two consecutive statements.
+"""
+import re
+from datetime import date
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from .config import Config
+from .money import to_cents
+
+_NUMBER_RE = re.compile(r'\d+')
+
+
+class Duplicate(NamedTuple):
+    """A row that repeats an earlier one (0-based row indexes)."""
+    row: int
+    duplicate_of: int
+    similarity: float
+    days_apart: int
+
+
+class StatementDuplicate(NamedTuple):
+    """A Duplicate across statements: (statement, row) positions, both 0-based."""
+    statement: int
+    row: int
+    duplicate_of_statement: int
+    duplicate_of: int
+    similarity: float
+    days_apart: int
+
+
+class DuplicateDetector:
+    """
+    Usage:
+        detector = DuplicateDetector()
+        for dup in detector.find(dates, amounts, descriptions, tx_types):
+            print(f"row {dup.row} repeats row {dup.duplicate_of}")
+    """
+
+    def __init__(self, date_window_days: int = Config.DUPLICATE_DATE_WINDOW_DAYS,
+                 min_similarity: float = Config.DUPLICATE_MIN_SIMILARITY, max_candidates: int = 32):
+        """
+        Args:
+            date_window_days: Max days between the two postings of a duplicate
+            min_similarity: Description similarity (0-1) at or above which rows match
+            max_candidates: Earlier rows of the same bucket compared per row
+        """
+        self.date_window_days = date_window_days
+        self.min_similarity = min_similarity
+        self.max_candidates = max_candidates
+
+    def find(self, dates: Sequence[str], amounts: Sequence[float], descriptions: Sequence[str],
+             tx_types: Optional[Sequence[str]] = None) -> List[Duplicate]:
+        """
+        Each row that repeats an earlier row, with the row it repeats:
+        the closest in date, then the earliest.
+
+        Dates are ISO strings; rows whose date does not parse are only
+        matched with rows carrying the identical date string (0 days apart).
+        """
+        ordinals: Dict[str, Optional[int]] = {}
+        for d in set(dates):
+            try:
+                ordinals[d] = date.fromisoformat(str(d)).toordinal()
+            except ValueError:
+                ordinals[d] = None
+
+        # Blocking key: same amount, same direction; unparsed dates also block on the raw string
+        keys = []
+        for i, (d, amt) in enumerate(zip(dates, amounts)):
+            ordinal = ordinals[d]
+            # Parsed and unparsed dates never share a block; both parts stay sortable
+            block = (to_cents(amt), tx_types[i] if tx_types is not None else "",
+                     ordinal is None, "" if ordinal is not None else str(d))
+            keys.append((block, ordinal or 0, i))
+        keys.sort()
+
+        norm = [' '.join(str(desc or "").lower().split()) for desc in descriptions]
+        numbers = [_NUMBER_RE.findall(text) for text in norm]
+
+        best: Dict[int, Duplicate] = {}
+        start = 0  # First key of the current bucket still inside the date window
+        for pos, (block, ordinal, i) in enumerate(keys):
+            if keys[start][0] != block:
+                start = pos
+            while ordinal - keys[start][1] > self.date_window_days:
+                start += 1
+            for _, other_ordinal, j in keys[max(start, pos - self.max_candidates):pos]:
+                similarity = self._similarity(norm[i], norm[j], numbers[i], numbers[j])
+                if similarity >= self.min_similarity:
+                    later, earlier = max(i, j), min(i, j)
+                    days_apart = ordinal - other_ordinal
+                    current = best.get(later)
+                    if current is None or (days_apart, earlier) < (current.days_apart, current.duplicate_of):
+                        best[later] = Duplicate(later, earlier, round(similarity, 3), days_apart)
+
+        return [best[row] for row in sorted(best)]
+
+    def find_in_statements(self, statements: Sequence[Sequence[Dict[str, Any]]]) -> List[StatementDuplicate]:
+        """
+        Duplicates among the transactions of several statements, checked as
+        one list: a row may repeat a row of its own or of another statement.
+
+        Args:
+            statements: One transaction list (post_date/amount/description/tx_type) per statement
+        """
+        rows = [(s, r, tx) for s, transactions in enumerate(statements) for r, tx in enumerate(transactions)]
+        found = self.find(
+            dates=[tx.get("post_date", "") for _, _, tx in rows],
+            amounts=[tx.get("amount", 0.0) for _, _, tx in rows],
+            descriptions=[tx.get("description", "") for _, _, tx in rows],
+            tx_types=[tx.get("tx_type", "") for _, _, tx in rows]
+        )
+        return [StatementDuplicate(rows[dup.row][0], rows[dup.row][1], rows[dup.duplicate_of][0],
+                                   rows[dup.duplicate_of][1], dup.similarity, dup.days_apart)
+                for dup in found]
+
+    def _similarity(self, a: str, b: str, numbers_a: List[str], numbers_b: List[str]) -> float:
+        if a == b:
+            return 1.0
+        if numbers_a and numbers_b and numbers_a != numbers_b:
+            return 0.0
+        matcher = SequenceMatcher(None, a, b, autojunk=False)
+        if matcher.real_quick_ratio() < self.min_similarity or matcher.quick_ratio() < self.min_similarity:
+            return 0.0
+        return matcher.ratio()
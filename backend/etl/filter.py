@@ -10,6 +10,9 @@ This filter separates them for accurate reconciliation and reporting.
 from typing import List, Dict, Tuple, Any
 from datetime import datetime
 import re
+from .columnar import TransactionBatch
+from .keywords import KeywordMatcher
+from .money import to_cents
 
 
 # ─────────────────────────────────────────────────────────────
@@ -29,6 +32,17 @@ SUMMARY_KEYWORDS = [
     "subtotal",
 ]
 
+# Keywords deciding which balance a metadata row carries
+BALANCE_ROW_OPENING = ["opening", "previous", "beginning", "forward"]
+BALANCE_ROW_CLOSING = ["ending", "closing", "final"]
+SUMMARY_ROW_OPENING = ["opening", "previous", "beginning"]
+SUMMARY_ROW_CLOSING = ["ending", "closing"]
+
+
+def _contains_any(text, keywords: List[str]):
+    """Vectorized substring test of a lower-cased string Series against keywords."""
+    return text.str.contains("|".join(re.escape(kw) for kw in keywords), regex=True)
+
 
 class TransactionFilter:
     """
@@ -42,6 +56,10 @@ class TransactionFilter:
     
     def __init__(self):
         self.summary_keywords = [kw.lower() for kw in SUMMARY_KEYWORDS]
+        # Every metadata keyword in one automaton: one scan per description
+        self._keywords = KeywordMatcher([
+            ("metadata", self.summary_keywords + BALANCE_ROW_OPENING + BALANCE_ROW_CLOSING)
+        ])
     
     def filter(self, rows: List[Dict]) -> Tuple[List[Dict], List[Dict], Dict[str, Any]]:
         """
@@ -53,12 +71,22 @@ class TransactionFilter:
         Returns:
             Tuple of (eligible_transactions, metadata_rows, extracted_metadata)
         """
+        eligible, metadata, balances = self.split(rows)
+        extracted_metadata = self.summarize(eligible, metadata, balances, len(rows))
+        return eligible, metadata, extracted_metadata
+
+    def split(self, rows: List[Dict]) -> Tuple[List[Dict], List[Dict], Dict[str, float]]:
+        """
+        Classify one batch of rows (e.g. a single page) without any
+        document-level bookkeeping, so callers can filter incrementally.
+        
+        Returns:
+            Tuple of (eligible, metadata, balances) where balances holds the
+            last 'opening'/'closing' balance seen in this batch
+        """
         eligible = []
         metadata = []
-        
-        # Track balances from metadata rows
-        opening_balance = None
-        closing_balance = None
+        balances: Dict[str, float] = {}
         
         for row in rows:
             is_metadata, balance_type = self._is_metadata_row(row)
@@ -66,10 +94,8 @@ class TransactionFilter:
             if is_metadata:
                 # Extract balance values from metadata rows
                 balance = row.get("balance")
-                if balance_type == "opening" and balance is not None:
-                    opening_balance = balance
-                elif balance_type == "closing" and balance is not None:
-                    closing_balance = balance
+                if balance_type in ("opening", "closing") and balance is not None:
+                    balances[balance_type] = balance
                 
                 # Mark as non-transaction
                 row["metadata"] = row.get("metadata", {})
@@ -87,6 +113,51 @@ class TransactionFilter:
                 row["metadata"]["is_eligible"] = False
                 metadata.append(row)
         
+        return eligible, metadata, balances
+
+    def split_batch(self, batch: TransactionBatch) -> Tuple[TransactionBatch, TransactionBatch, Dict[str, float]]:
+        """
+        Columnar split(): same rules evaluated on whole columns.
+        
+        Returns:
+            Tuple of (eligible, metadata, balances) batches/dict as in split()
+        """
+        import numpy as np
+        frame = batch.frame
+        desc = frame["description"].astype(str).str.lower()
+        is_balance_row = (frame["tx_type"] == "balance").to_numpy()
+        is_summary_row = _contains_any(desc, self.summary_keywords).to_numpy() & ~is_balance_row
+        is_metadata = is_balance_row | is_summary_row
+        
+        # Balance type: opening/closing keyword sets differ for balance vs summary rows
+        opening = np.where(is_balance_row, _contains_any(desc, BALANCE_ROW_OPENING),
+                           _contains_any(desc, SUMMARY_ROW_OPENING))
+        closing = ~opening & np.where(is_balance_row, _contains_any(desc, BALANCE_ROW_CLOSING),
+                                      _contains_any(desc, SUMMARY_ROW_CLOSING))
+        
+        # Last opening/closing balance seen wins, as in the row loop
+        balances: Dict[str, float] = {}
+        has_balance = frame["balance"].notna().to_numpy()
+        for balance_type, mask in (("opening", opening), ("closing", closing)):
+            hits = np.flatnonzero(is_metadata & mask & has_balance)
+            if hits.size:
+                balances[balance_type] = frame["balance"].iat[hits[-1]]
+        
+        dates = frame["post_date"]
+        is_eligible = ~is_metadata & (dates.notna() & (dates != "")).to_numpy() & (frame["amount"] > 0).to_numpy()
+        
+        frame["is_eligible"] = is_eligible
+        frame.loc[~is_eligible, "dq_flag"] = "non_transaction"
+        return batch.take(is_eligible), batch.take(~is_eligible), balances
+
+    def summarize(self, eligible: List[Dict], metadata: List[Dict],
+                  balances: Dict[str, float], total_rows: int) -> Dict[str, Any]:
+        """
+        Build the document-level extracted_metadata once all batches are split.
+        """
+        opening_balance = balances.get("opening")
+        closing_balance = balances.get("closing")
+        
         # If no explicit opening/closing found, use first/last balance values
         if opening_balance is None and eligible:
             first_balance = eligible[0].get("balance")
@@ -95,24 +166,22 @@ class TransactionFilter:
                 first_amt = eligible[0].get("amount", 0)
                 first_type = eligible[0].get("tx_type", "")
                 if first_type == "credit":
-                    opening_balance = first_balance - first_amt
+                    opening_balance = (to_cents(first_balance) - to_cents(first_amt)) / 100
                 elif first_type == "debit":
-                    opening_balance = first_balance + first_amt
+                    opening_balance = (to_cents(first_balance) + to_cents(first_amt)) / 100
                 else:
                     opening_balance = first_balance
         
         if closing_balance is None and eligible:
             closing_balance = eligible[-1].get("balance")
         
-        extracted_metadata = {
+        return {
             "opening_balance": opening_balance or 0.0,
             "closing_balance": closing_balance or 0.0,
-            "total_rows": len(rows),
+            "total_rows": total_rows,
             "eligible_count": len(eligible),
             "metadata_count": len(metadata),
         }
-        
-        return eligible, metadata, extracted_metadata
     
     def _is_metadata_row(self, row: Dict) -> Tuple[bool, str]:
         """
@@ -124,25 +193,24 @@ class TransactionFilter:
         """
         desc = str(row.get("description", "")).lower()
         tx_type = row.get("tx_type", "")
-        amount = row.get("amount", 0)
+        hits = self._keywords.hits(desc)
         
         # Check for explicit balance row type
         if tx_type == "balance":
             # Determine if opening or closing based on keywords
-            if any(kw in desc for kw in ["opening", "previous", "beginning", "forward"]):
+            if hits.intersection(BALANCE_ROW_OPENING):
                 return True, "opening"
-            elif any(kw in desc for kw in ["ending", "closing", "final"]):
+            elif hits.intersection(BALANCE_ROW_CLOSING):
                 return True, "closing"
             return True, "other"
         
         # Check for summary keywords
-        for keyword in self.summary_keywords:
-            if keyword in desc:
-                if any(kw in desc for kw in ["opening", "previous", "beginning"]):
-                    return True, "opening"
-                elif any(kw in desc for kw in ["ending", "closing"]):
-                    return True, "closing"
-                return True, "other"
+        if hits.intersection(self.summary_keywords):
+            if hits.intersection(SUMMARY_ROW_OPENING):
+                return True, "opening"
+            elif hits.intersection(SUMMARY_ROW_CLOSING):
+                return True, "closing"
+            return True, "other"
         
         return False, ""
     
@@ -0,0 +1,130 @@
+"""
+Keyword Matcher - Shared Aho-Corasick automaton for rule keyword scans.
+
+Header detection, column mapping, tx-type detection, the metadata filter,
+the line lexer and categorization all ask "which of these keywords occur in
+this text?". A KeywordMatcher is compiled once per rule set and answers that
+in a single left-to-right scan, instead of one `kw in text` test per keyword.
+
+Uses the C automaton from pyahocorasick when it is installed, otherwise a
+pure-Python automaton with identical results. Matching is case-sensitive:
+callers pass lower-cased text, as the keyword lists are lower-case.
+"""
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over ordered keyword groups.
+
+    Groups are (label, keywords) pairs; earlier groups take priority, which
+    gives first() the same first-match-wins result as testing each group's
+    keywords in order.
+
+    Usage:
+        matcher = KeywordMatcher([("credit", ["deposit", "refund"]), ("debit", ["fee"])])
+        matcher.first("atm fee refund")   # "credit"
+        matcher.hits("atm fee refund")    # {"fee", "refund"}
+    """
+
+    def __init__(self, groups: Iterable[Tuple[str, Iterable[str]]]):
+        self.labels: List[str] = []
+        self.keywords: Dict[str, int] = {}  # keyword -> priority of the first group listing it
+        for label, keywords in groups:
+            priority = len(self.labels)
+            self.labels.append(label)
+            for kw in keywords:
+                if kw and kw not in self.keywords:
+                    self.keywords[kw] = priority
+
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for kw, priority in self.keywords.items():
+                self._automaton.add_word(kw, (priority, kw))
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build_tables()
+
+    def first(self, text: str) -> Optional[str]:
+        """Label of the highest-priority group with a keyword in text (None if no hit)."""
+        if not text or not self.keywords:
+            return None
+        best = len(self.labels)
+        if self._automaton is not None:
+            for _, (priority, _kw) in self._automaton.iter(text):
+                if priority < best:
+                    best = priority
+                    if best == 0:
+                        break
+        else:
+            delta, best_out = self._delta, self._best
+            state = 0
+            for ch in text:
+                state = delta[state].get(ch, 0)
+                if best_out[state] < best:
+                    best = best_out[state]
+                    if best == 0:
+                        break
+        return self.labels[best] if best < len(self.labels) else None
+
+    def hits(self, text: str) -> FrozenSet[str]:
+        """All keywords that occur in text."""
+        if not text or not self.keywords:
+            return frozenset()
+        if self._automaton is not None:
+            return frozenset(kw for _, (_priority, kw) in self._automaton.iter(text))
+        found = set()
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return frozenset(found)
+
+    def _build_tables(self) -> None:
+        """Trie + failure links, flattened into a DFA (state -> {char: next state})."""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Sequence[str]] = [()]
+        for kw in self.keywords:
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append(())
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            outputs[state] = (kw,)
+
+        fail = [0] * len(goto)
+        order = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                outputs[nxt] = tuple(outputs[nxt]) + tuple(outputs[fail[nxt]])
+                queue.append(nxt)
+
+        # Complete the transitions so a scan never walks failure links
+        delta = [dict(g) for g in goto]
+        for state in order:
+            for ch, nxt in delta[fail[state]].items():
+                delta[state].setdefault(ch, nxt)
+
+        self._delta = delta
+        self._outputs = outputs
+        self._best = [min((self.keywords[kw] for kw in out), default=len(self.labels)) for out in outputs]
@@ -0,0 +1,87 @@
+"""
+Statement Line Lexer - Precompiled tokenizer for the raw-text fallback.
+
+Splits one line of statement text into its date, amount and description
+tokens and classifies it (transaction / balance / skip) in a single sweep
+with module-level precompiled patterns: the date search stops at the first
+date and the amount scan covers only the text after it, and one keyword
+automaton replaces the separate skip/balance scans. Only lines without a
+numeric date are re-scanned for an alphabetic month date ("Jan 5, 2024").
+
+Amounts are signed. A leading minus ("-20.00", "$-5.00"), a trailing
+minus ("3.00-") or enclosing parentheses ("(3.00)") make the amount
+negative, and the sign marks are consumed with the amount, so no stray
+"-" or "()" is left in the description. A hyphen inside a word
+("PRE-AUTH") is not a sign. Unsigned lines tokenize exactly as the
+original per-line regex/replace logic in
+HeuristicTransformer._parse_line_heuristic did.
+"""
+import re
+from typing import List, NamedTuple, Optional
+from .keywords import KeywordMatcher
+from .money import token_cents
+
+
+DATE_RE = re.compile(r'(\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?)')
+ALPHA_DATE_RE = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}(,?\s+\d{2,4})?', re.I)
+AMOUNT_RE = re.compile(r'\$?[\d,]+\.\d{2}')
+# Same amounts, plus the sign forms: a standalone leading/trailing minus or
+# enclosing parentheses. Only used on text that has a '-' or '('.
+SIGNED_AMOUNT_RE = re.compile(r'\(\$?[\d,]+\.\d{2}\)|(?:(?<!\S)(?:-\$?|\$-)|\$)?[\d,]+\.\d{2}(?:-(?!\S))?')
+
+# Lines without a date are kept only if they carry one of these balances
+UNDATED_BALANCE_KEYWORDS = KeywordMatcher([
+    ("balance", ['opening balance', 'beginning balance', 'ending balance'])
+])
+
+SKIP_KEYWORDS = ['your payment will be', 'statement period', 'total credits', 'total debits']
+BALANCE_KEYWORDS = ['previous balance', 'ending balance', 'opening balance', 'beginning balance']
+# Skip wins over balance when a line has both
+LINE_KEYWORDS = KeywordMatcher([("skip", SKIP_KEYWORDS), ("balance", BALANCE_KEYWORDS)])
+
+
+class LexedLine(NamedTuple):
+    """Tokens of one statement line."""
+    date: Optional[str]           # Matched date text; None for undated balance lines
+    amounts: List[float]          # Amounts after the date, in order (signed)
+    description: str              # Line minus date and amounts, whitespace-collapsed
+    kind: str                     # 'transaction' | 'balance' | 'skip'
+
+
+def lex_line(line: str) -> Optional[LexedLine]:
+    """
+    Tokenize a raw statement line.
+
+    Returns:
+        LexedLine, or None when the line has no date, no balance marker,
+        or no amount after the date
+    """
+    line_clean = line.strip()
+    if not line_clean:
+        return None
+
+    date_match = DATE_RE.search(line_clean) or ALPHA_DATE_RE.search(line_clean)
+    if date_match:
+        date_val = date_match.group(0)
+        prefix = line_clean[:date_match.start()]
+        suffix = line_clean[date_match.end():]
+    elif UNDATED_BALANCE_KEYWORDS.first(line_clean.lower()):
+        date_val, prefix, suffix = None, "", line_clean
+    else:
+        return None
+
+    amount_re = SIGNED_AMOUNT_RE if '-' in suffix or '(' in suffix else AMOUNT_RE
+    tokens = amount_re.findall(suffix)
+    if not tokens:
+        return None
+
+    # Tokens are removed wherever they occur (not just at their match), as before
+    for token in tokens:
+        suffix = suffix.replace(token, '')
+    description = ' '.join(f"{prefix} {suffix}".split())
+
+    kind = LINE_KEYWORDS.first(description.lower()) or 'transaction'
+
+    # Every token is digits with exactly two decimals, plus optional sign marks
+    amounts = [token_cents(t) / 100 for t in tokens]
+    return LexedLine(date_val, amounts, description, kind)
@@ -6,40 +6,176 @@ Generates interview-grade Excel output with:
 2. Financial Summary sheet - Totals, balances, and reconciliation check
 3. Data Quality Report sheet - Clean/flagged rows with reasons
 4. Audit Trail sheet - Processing metadata
+
+Sheets are described as rows of (value, named style) cells. By default
+(EXCEL_WRITE_ONLY) they are streamed through a write-only workbook, so
+memory does not grow with a cell object per value; the regular workbook
+writer produces the same layout.
+
+CSV and JSON-lines (ndjson) are encoded straight from the transactions in
+row chunks (iter_chunks / write), without building a DataFrame or holding
+the whole file in memory.
 """
-import pandas as pd
-from io import BytesIO
-from typing import List, Dict, Any
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from io import BytesIO, StringIO
+from itertools import chain, islice
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, Optional, Sequence, Union
+from .config import Config
+from .columnar import TransactionBatch
+from .money import column_cents, to_cents
+
+
+class _ColumnWidths:
+    """
+    Running per-column maximum display length of the rows written so far.
+    A column is as wide as its longest value plus 4, capped at 60; columns
+    spanned by merged ranges are included even if they hold no value.
+    """
+
+    def __init__(self, merged: Iterable[str] = ()):
+        from openpyxl.utils import range_boundaries
+        self.max_lengths: List[int] = [0] * max([range_boundaries(ref)[2] for ref in merged] or [0])
+
+    def add(self, row: list) -> None:
+        max_lengths = self.max_lengths
+        if len(row) > len(max_lengths):
+            max_lengths += [0] * (len(row) - len(max_lengths))
+        for col_idx, spec in enumerate(row):
+            value = spec[0] if isinstance(spec, tuple) else spec
+            if value:
+                length = len(value) if isinstance(value, str) else len(str(value))
+                if length > max_lengths[col_idx]:
+                    max_lengths[col_idx] = length
+
+    def apply(self, ws) -> None:
+        """Set the widths on ws: O(columns)."""
+        from openpyxl.utils import get_column_letter
+        for col_idx, length in enumerate(self.max_lengths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(length + 4, 60)
 
 
 class UniversalLoader:
     """
     Universal exporter for multiple document formats.
-    Supported: 'xlsx', 'csv', 'txt'
+    Supported: 'xlsx', 'csv', 'ndjson', 'txt', 'parquet', 'arrow' (the last two need pyarrow)
     """
     
-    def __init__(self):
+    SUPPORTED_FORMATS = ("xlsx", "csv", "ndjson", "txt", "parquet", "arrow")
+    # Formats written row chunk by row chunk by iter_chunks() / write()
+    STREAMING_FORMATS = ("csv", "ndjson")
+    
+    def __init__(self, write_only: Optional[bool] = None):
+        """
+        Args:
+            write_only: Stream xlsx rows through a write-only workbook
+                        (default: Config.EXCEL_WRITE_ONLY)
+        """
         self.currency_format = '$#,##0.00'
-        self.header_font = Font(bold=True, color="FFFFFF")
-        self.header_fill = PatternFill(start_color="2D5016", end_color="2D5016", fill_type="solid")
-        self.warning_fill = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
-        self.success_fill = PatternFill(start_color="DCFCE7", end_color="DCFCE7", fill_type="solid")
-        self.border = Border(bottom=Side(style='thin', color='DDDDDD'))
+        self.write_only = Config.EXCEL_WRITE_ONLY if write_only is None else write_only
+
+    def _add_named_styles(self, wb) -> None:
+        """
+        Register the report's named styles on a new workbook. Every styled
+        cell refers to one of these instead of carrying its own font/fill/border.
+        Built per workbook (openpyxl binds a NamedStyle to one workbook), and
+        here rather than at import to keep openpyxl out of startup imports.
+        """
+        from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+        from openpyxl.styles.fonts import DEFAULT_FONT
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="2D5016", end_color="2D5016", fill_type="solid")
+        warning_fill = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
+        success_fill = PatternFill(start_color="DCFCE7", end_color="DCFCE7", fill_type="solid")
+        border = Border(bottom=Side(style='thin', color='DDDDDD'))
+        for style in [
+            NamedStyle("qc_header", font=header_font, fill=header_fill),
+            NamedStyle("qc_header_center", font=header_font, fill=header_fill, alignment=Alignment(horizontal='center')),
+            NamedStyle("qc_row", font=DEFAULT_FONT, border=border),
+            NamedStyle("qc_row_currency", font=DEFAULT_FONT, border=border, number_format=self.currency_format),
+            NamedStyle("qc_currency", font=DEFAULT_FONT, number_format=self.currency_format),
+            NamedStyle("qc_title", font=Font(bold=True, size=14)),
+            NamedStyle("qc_section", font=Font(bold=True, size=12)),
+            NamedStyle("qc_label", font=Font(bold=True)),
+            NamedStyle("qc_status_ok", font=Font(bold=True), fill=success_fill),
+            NamedStyle("qc_status_warning", font=Font(bold=True), fill=warning_fill),
+            NamedStyle("qc_fill_ok", font=DEFAULT_FONT, fill=success_fill),
+            NamedStyle("qc_fill_warning", font=DEFAULT_FONT, fill=warning_fill),
+        ]:
+            wb.add_named_style(style)
 
-    def generate(self, transactions: List[Dict], audit_data: Dict[str, Any], target_format: str = "xlsx") -> BytesIO:
+    def generate(self, transactions: Union[List[Dict], TransactionBatch], audit_data: Dict[str, Any],
+                 target_format: str = "xlsx") -> BytesIO:
         """
         Generate output in the requested format.
+        
+        Accepts Transaction dicts or a columnar TransactionBatch.
         """
-        if target_format == "csv":
-            return self._generate_csv(transactions)
+        if target_format in self.STREAMING_FORMATS:
+            return BytesIO(b"".join(self.iter_chunks(transactions, audit_data, target_format)))
         elif target_format == "txt":
             return self._generate_text(transactions, audit_data)
+        elif target_format in ("parquet", "arrow"):
+            return self._generate_arrow(transactions, audit_data, target_format)
         else:
             return self._generate_excel(transactions, audit_data)
 
-    def _generate_excel(self, transactions: List[Dict], audit_data: Dict[str, Any]) -> BytesIO:
+    def iter_chunks(self, transactions: Union[List[Dict], TransactionBatch], audit_data: Dict[str, Any],
+                    target_format: str = "xlsx") -> Iterator[bytes]:
+        """
+        Output as a sequence of byte chunks. CSV and NDJSON are encoded
+        Config.EXPORT_CHUNK_ROWS rows at a time straight from the
+        transactions; other formats are rendered whole and yielded once.
+        """
+        if target_format == "csv":
+            return self._iter_csv(transactions)
+        if target_format == "ndjson":
+            return self._iter_ndjson(transactions)
+        return iter([self.generate(transactions, audit_data, target_format).getvalue()])
+
+    def write(self, transactions: Union[List[Dict], TransactionBatch], audit_data: Dict[str, Any],
+              target_format: str, fileobj: BinaryIO) -> int:
+        """Write the output to a binary file object chunk by chunk; returns the byte count."""
+        size = 0
+        for chunk in self.iter_chunks(transactions, audit_data, target_format):
+            fileobj.write(chunk)
+            size += len(chunk)
+        return size
+
+    def _iter_rows(self, transactions: Union[List[Dict], TransactionBatch]) -> Iterator[tuple]:
+        """(post_date, description, category, amount, tx_type, balance, dq_flag) per transaction, lazily."""
+        if isinstance(transactions, TransactionBatch):
+            cols = self._columns(transactions)
+            return zip(cols["post_date"], cols["description"], cols["category"], cols["amount"],
+                       cols["tx_type"], cols["balance"], cols["dq_flag"])
+        return ((tx.get("post_date"), tx.get("description"), tx.get("category", "Uncategorized"),
+                 tx.get("amount", 0.0), tx.get("tx_type", "debit"), tx.get("balance"),
+                 tx.get("metadata", {}).get("dq_flag", "unknown")) for tx in transactions)
+
+    def _columns(self, transactions: Union[List[Dict], TransactionBatch]) -> Dict[str, list]:
+        """Export columns, read straight from a batch or gathered once from dicts."""
+        if isinstance(transactions, TransactionBatch):
+            frame = transactions.frame
+            return {
+                "post_date": frame["post_date"].tolist(),
+                "description": frame["description"].tolist(),
+                "category": frame["category"].fillna("Uncategorized").tolist(),
+                "amount": frame["amount"].tolist(),
+                "tx_type": frame["tx_type"].tolist(),
+                "balance": [None if b is None or b != b else b for b in frame["balance"].tolist()],
+                "dq_flag": frame["dq_flag"].tolist(),
+                "extraction_method": frame["extraction_method"].tolist(),
+            }
+        return {
+            "post_date": [tx.get("post_date") for tx in transactions],
+            "description": [tx.get("description") for tx in transactions],
+            "category": [tx.get("category", "Uncategorized") for tx in transactions],
+            "amount": [tx.get("amount", 0.0) for tx in transactions],
+            "tx_type": [tx.get("tx_type", "debit") for tx in transactions],
+            "balance": [tx.get("balance") for tx in transactions],
+            "dq_flag": [tx.get("metadata", {}).get("dq_flag", "unknown") for tx in transactions],
+            "extraction_method": [tx.get("metadata", {}).get("extraction_method", "unknown") for tx in transactions],
+        }
+
+    def _generate_excel(self, transactions: Union[List[Dict], TransactionBatch], audit_data: Dict[str, Any]) -> BytesIO:
         """
         Structured Excel Report with multiple sheets:
         1. Transactions - Full data with categories
@@ -49,50 +185,48 @@ class UniversalLoader:
         output = BytesIO()
         from openpyxl import Workbook
         
-        wb = Workbook()
+        wb = Workbook(write_only=self.write_only)
+        if not self.write_only:
+            wb.remove(wb.active)
+        self._add_named_styles(wb)
         
         # ════════════════════════════════════════════════════════════════
         # SHEET 1: TRANSACTIONS
         # ════════════════════════════════════════════════════════════════
-        ws1 = wb.active
-        ws1.title = "Transactions"
-        
         headers = ["Date", "Description", "Category", "Debit", "Credit", "Balance", "DQ Flag"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws1.cell(row=1, column=col_idx, value=header)
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.alignment = Alignment(horizontal='center')
-        
-        for row_idx, tx in enumerate(transactions, 2):
-            tx_type = tx.get("tx_type", "debit")
-            amount = tx.get("amount", 0.0)
-            dq_flag = tx.get("metadata", {}).get("dq_flag", "unknown")
-            
-            row_data = [
-                tx.get("post_date"),
-                tx.get("description"),
-                tx.get("category", "Uncategorized"),
-                amount if tx_type == "debit" else None,
-                amount if tx_type == "credit" else None,
-                tx.get("balance"),
-                dq_flag.replace('_', ' ').upper()
-            ]
-            
-            for col_idx, val in enumerate(row_data, 1):
-                cell = ws1.cell(row=row_idx, column=col_idx, value=val)
-                if col_idx in [4, 5, 6]:  # Debit, Credit, Balance
-                    cell.number_format = self.currency_format
-                cell.border = self.border
-        
-        self._auto_width(ws1)
-        ws1.freeze_panes = "A2"
+        cols = self._columns(transactions)
+        self._write_sheet(wb, "Transactions", self._transaction_rows(headers, cols), freeze="A2")
         
         # ════════════════════════════════════════════════════════════════
         # SHEET 2: FINANCIAL SUMMARY
         # ════════════════════════════════════════════════════════════════
-        ws2 = wb.create_sheet("Financial Summary")
+        self._write_sheet(wb, "Financial Summary", self._summary_rows(audit_data), merged=["A1:B1"])
+        
+        # ════════════════════════════════════════════════════════════════
+        # SHEET 3: DATA QUALITY REPORT
+        # ════════════════════════════════════════════════════════════════
+        self._write_sheet(wb, "Data Quality Report", self._dq_rows(audit_data), merged=["A1:D1"])
         
+        wb.save(output)
+        output.seek(0)
+        return output
+
+    def _transaction_rows(self, headers: List[str], cols: Dict[str, list]) -> Iterator[list]:
+        yield [(header, "qc_header_center") for header in headers]
+        for post_date, description, category, amount, tx_type, balance, dq_flag in zip(
+                cols["post_date"], cols["description"], cols["category"], cols["amount"],
+                cols["tx_type"], cols["balance"], cols["dq_flag"]):
+            yield [
+                (post_date, "qc_row"),
+                (description, "qc_row"),
+                (category, "qc_row"),
+                (amount if tx_type == "debit" else None, "qc_row_currency"),
+                (amount if tx_type == "credit" else None, "qc_row_currency"),
+                (balance, "qc_row_currency"),
+                (dq_flag.replace('_', ' ').upper(), "qc_row")
+            ]
+
+    def _summary_rows(self, audit_data: Dict[str, Any]) -> List[list]:
         financials = audit_data.get("financials", {})
         reconciliation = audit_data.get("reconciliation", {})
         
@@ -101,74 +235,40 @@ class UniversalLoader:
         opening = financials.get("opening_balance", 0)
         closing = financials.get("closing_balance", 0)
         
-        # Title
-        ws2.cell(row=1, column=1, value="FINANCIAL SUMMARY").font = Font(bold=True, size=14)
-        ws2.merge_cells('A1:B1')
-        
+        rows = [[("FINANCIAL SUMMARY", "qc_title")], []]
         summary_items = [
             ("", ""),  # Spacer
             ("Opening Balance", opening),
             ("Total Credits (+)", total_credits),
             ("Total Debits (-)", total_debits),
-            ("Net Change", total_credits - total_debits),
+            ("Net Change", round(total_credits - total_debits, 2)),
             ("Closing Balance", closing),
         ]
-        
-        row = 3
         for key, val in summary_items:
-            if key:
-                ws2.cell(row=row, column=1, value=key).font = Font(bold=True)
-                c = ws2.cell(row=row, column=2, value=val)
-                if isinstance(val, (int, float)):
-                    c.number_format = self.currency_format
-            row += 1
+            rows.append([(key, "qc_label"), self._value_cell(val)] if key else [])
         
         # Reconciliation Check Section
-        row += 1
-        ws2.cell(row=row, column=1, value="RECONCILIATION CHECK").font = Font(bold=True, size=12)
-        row += 1
-        
-        expected = reconciliation.get("expected_closing", 0)
-        actual = reconciliation.get("actual_closing", 0)
+        rows += [[], [("RECONCILIATION CHECK", "qc_section")]]
         is_balanced = reconciliation.get("is_balanced", True)
-        status = reconciliation.get("status", "N/A")
-        
         recon_items = [
-            ("Opening + Credits - Debits =", expected),
-            ("Actual Closing Balance =", actual),
-            ("Status", status),
+            ("Opening + Credits - Debits =", reconciliation.get("expected_closing", 0)),
+            ("Actual Closing Balance =", reconciliation.get("actual_closing", 0)),
         ]
-        
         for key, val in recon_items:
-            ws2.cell(row=row, column=1, value=key).font = Font(bold=True)
-            c = ws2.cell(row=row, column=2, value=val)
-            if isinstance(val, (int, float)):
-                c.number_format = self.currency_format
-            if key == "Status":
-                c.fill = self.success_fill if is_balanced else self.warning_fill
-                c.font = Font(bold=True)
-            row += 1
-        
-        self._auto_width(ws2)
-        
-        # ════════════════════════════════════════════════════════════════
-        # SHEET 3: DATA QUALITY REPORT
-        # ════════════════════════════════════════════════════════════════
-        ws3 = wb.create_sheet("Data Quality Report")
-        
+            rows.append([(key, "qc_label"), self._value_cell(val)])
+        rows.append([("Status", "qc_label"),
+                     (reconciliation.get("status", "N/A"), "qc_status_ok" if is_balanced else "qc_status_warning")])
+        return rows
+
+    def _dq_rows(self, audit_data: Dict[str, Any]) -> List[list]:
         dq_report = audit_data.get("dq_report", {})
         dq_stats = dq_report.get("stats", audit_data.get("dq_stats", {}))
         flagged_rows = dq_report.get("flagged_rows", [])
         
-        # Title
-        ws3.cell(row=1, column=1, value="DATA QUALITY REPORT").font = Font(bold=True, size=14)
-        ws3.merge_cells('A1:D1')
+        rows = [[("DATA QUALITY REPORT", "qc_title")], []]
         
         # Summary Statistics
-        row = 3
-        ws3.cell(row=row, column=1, value="Summary Statistics").font = Font(bold=True, size=12)
-        row += 1
-        
+        rows.append([("Summary Statistics", "qc_section")])
         stat_items = [
             ("Total Transactions", dq_stats.get("total", 0)),
             ("Clean Transactions (Table)", dq_stats.get("CLEAN", 0)),
@@ -177,87 +277,222 @@ class UniversalLoader:
             ("Non-Transaction Rows (Metadata)", dq_stats.get("NON_TRANSACTION", 0)),
             ("Total Flags", len(flagged_rows)),
         ]
+        rows += [[key, val] for key, val in stat_items]
         
-        for key, val in stat_items:
-            ws3.cell(row=row, column=1, value=key)
-            ws3.cell(row=row, column=2, value=val)
-            row += 1
+        # Running Balance Check
+        balance_chain = dq_report.get("balance_chain", {})
+        if balance_chain:
+            rows += [[], [("Running Balance Check", "qc_section")]]
+            consistent = balance_chain.get("is_consistent")
+            rows.append(["Rows With Balance", balance_chain.get("rows_checked", 0)])
+            rows.append(["Chain Breaks", balance_chain.get("breaks", 0)])
+            status = "Not enough balances" if consistent is None else ("✅ Consistent" if consistent else "⚠️ Broken")
+            rows.append(["Status", status if consistent is None
+                         else (status, "qc_fill_ok" if consistent else "qc_fill_warning")])
+            
+            break_rows = balance_chain.get("break_rows", [])
+            if break_rows:
+                rows.append([])
+                rows.append([(header, "qc_header") for header in ["Row #", "Date", "Description", "Expected Balance",
+                                                                   "Statement Balance", "Gap"]])
+                for brk in break_rows:
+                    rows.append([brk.get("row", ""), brk.get("date", ""), brk.get("description", "")] +
+                                [(brk.get(key, 0), "qc_currency") for key in ("expected_balance", "actual_balance", "gap")])
         
         # Flagged Rows Table
-        row += 1
-        ws3.cell(row=row, column=1, value="Flagged Rows Detail").font = Font(bold=True, size=12)
-        row += 1
-        
+        rows += [[], [("Flagged Rows Detail", "qc_section")]]
         if flagged_rows:
             flag_headers = ["Row #", "Date", "Description", "Amount", "Flag Type", "Reason"]
-            for col_idx, header in enumerate(flag_headers, 1):
-                cell = ws3.cell(row=row, column=col_idx, value=header)
-                cell.font = self.header_font
-                cell.fill = self.header_fill
-            row += 1
-            
+            rows.append([(header, "qc_header") for header in flag_headers])
             for flag in flagged_rows:
-                ws3.cell(row=row, column=1, value=flag.get("row", ""))
-                ws3.cell(row=row, column=2, value=flag.get("date", ""))
-                ws3.cell(row=row, column=3, value=flag.get("description", ""))
-                c = ws3.cell(row=row, column=4, value=flag.get("amount", 0))
-                c.number_format = self.currency_format
-                ws3.cell(row=row, column=5, value=flag.get("flag_type", "").upper())
-                ws3.cell(row=row, column=6, value=flag.get("reason", ""))
-                row += 1
+                rows.append([
+                    flag.get("row", ""),
+                    flag.get("date", ""),
+                    flag.get("description", ""),
+                    (flag.get("amount", 0), "qc_currency"),
+                    flag.get("flag_type", "").upper(),
+                    flag.get("reason", "")
+                ])
         else:
-            ws3.cell(row=row, column=1, value="✅ No flagged rows - all data passed quality checks").fill = self.success_fill
+            rows.append([("✅ No flagged rows - all data passed quality checks", "qc_fill_ok")])
+        return rows
+
+    @staticmethod
+    def _value_cell(val: Any) -> Any:
+        """Currency-formatted cell for numbers, plain cell otherwise."""
+        return (val, "qc_currency") if isinstance(val, (int, float)) else val
+
+    def _write_sheet(self, wb, title: str, rows: Iterable[list], merged: Sequence[str] = (),
+                     freeze: Optional[str] = None) -> None:
+        """
+        Write one sheet from row specs. A row is a list of cells, each a plain
+        value or a (value, named style) pair; [] is an empty row.
+
+        Column widths are tracked while the rows are written. Write-only
+        sheets stream rows straight to the workbook's temp file, so their
+        widths must be set before the first row: they are estimated from the
+        first EXCEL_WIDTH_SAMPLE_ROWS rows (exact for shorter sheets).
+        """
+        ws = wb.create_sheet(title)
+        if freeze:
+            ws.freeze_panes = freeze
+        widths = _ColumnWidths(merged)
         
-        self._auto_width(ws3)
+        if not self.write_only:
+            for row_idx, row in enumerate(rows, 1):
+                widths.add(row)
+                for col_idx, spec in enumerate(row, 1):
+                    value, style = spec if isinstance(spec, tuple) else (spec, None)
+                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                    if style:
+                        cell.style = style
+            for ref in merged:
+                ws.merge_cells(ref)
+            widths.apply(ws)
+            return
         
-        wb.save(output)
-        output.seek(0)
-        return output
+        from openpyxl.cell import WriteOnlyCell
+        rows = iter(rows)
+        sample = list(islice(rows, Config.EXCEL_WIDTH_SAMPLE_ROWS))
+        for row in sample:
+            widths.add(row)
+        widths.apply(ws)
+        for ref in merged:
+            ws.merged_cells.add(ref)
+        
+        # One styled cell per (column, style), re-filled for every row: append()
+        # serializes the row before returning, so the cell objects can be reused
+        styled: Dict[tuple, Any] = {}
+        for row in chain(sample, rows):
+            out = []
+            for col_idx, spec in enumerate(row, 1):
+                if isinstance(spec, tuple):
+                    value, style = spec
+                    cell = styled.get((col_idx, style))
+                    if cell is None:
+                        cell = styled[(col_idx, style)] = WriteOnlyCell(ws)
+                        cell.style = style
+                    cell.value = value
+                    out.append(cell)
+                else:
+                    out.append(spec)
+            ws.append(out)
+
+    def _iter_csv(self, transactions: Union[List[Dict], TransactionBatch]) -> Iterator[bytes]:
+        """CSV export for interoperability - includes category"""
+        import csv
+        buffer = StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        chunk_rows = Config.EXPORT_CHUNK_ROWS
+        written = 0
+        for post_date, description, category, amount, tx_type, balance, dq_flag in self._iter_rows(transactions):
+            if not written:
+                writer.writerow(["Date", "Description", "Category", "Debit", "Credit", "Balance", "DQ_Flag"])
+            amount = float(amount or 0.0)
+            writer.writerow([
+                post_date,
+                description,
+                category,
+                amount if tx_type == "debit" else 0.0,
+                amount if tx_type == "credit" else 0.0,
+                float(balance or 0.0),
+                dq_flag
+            ])
+            written += 1
+            if written % chunk_rows == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        if not written:
+            yield b"\n"  # Header-less empty file, as pandas wrote it
+        elif buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
 
-    def _generate_csv(self, transactions: List[Dict]) -> BytesIO:
-        """Simple CSV export for interoperability - includes category"""
-        flattened = []
-        for tx in transactions:
-            tx_type = tx.get("tx_type", "debit")
-            amount = tx.get("amount", 0.0)
-            flattened.append({
-                "Date": tx.get("post_date"),
-                "Description": tx.get("description"),
-                "Category": tx.get("category", "Uncategorized"),
-                "Debit": amount if tx_type == "debit" else 0.0,
-                "Credit": amount if tx_type == "credit" else 0.0,
-                "Balance": tx.get("balance") or 0.0,
-                "DQ_Flag": tx.get("metadata", {}).get("dq_flag", "unknown")
-            })
+    def _iter_ndjson(self, transactions: Union[List[Dict], TransactionBatch]) -> Iterator[bytes]:
+        """JSON-lines export: one Transaction object per line (dq_flag flattened)."""
+        import json
+        chunk_rows = Config.EXPORT_CHUNK_ROWS
+        lines: List[str] = []
+        for post_date, description, category, amount, tx_type, balance, dq_flag in self._iter_rows(transactions):
+            lines.append(json.dumps({
+                "post_date": post_date,
+                "description": description,
+                "amount": amount,
+                "tx_type": tx_type,
+                "category": category,
+                "balance": balance,
+                "dq_flag": dq_flag
+            }, ensure_ascii=False))
+            if len(lines) == chunk_rows:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _generate_arrow(self, transactions: Union[List[Dict], TransactionBatch], audit_data: Dict[str, Any],
+                        target_format: str) -> BytesIO:
+        """
+        Typed columnar export for bulk loaders: Parquet or Arrow IPC (file format).
+
+        Columns follow schema.Transaction: post_date as date32 (null when the
+        text is not a date), amounts and balances as int64 cents, and
+        dictionary-encoded tx_type / category / dq_flag / extraction_method.
+        The document hash, source file, statement metadata, financials and
+        reconciliation are JSON values in the file's key-value metadata.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError(f"{target_format} output requires pyarrow (pip install pyarrow)")
+        import json
+        from datetime import date
+        
+        cols = self._columns(transactions)
+        dates: Dict[Any, Optional[date]] = {}
+        for raw in set(cols["post_date"]):
+            try:
+                dates[raw] = date.fromisoformat(raw)
+            except (TypeError, ValueError):
+                dates[raw] = None
+        
+        table = pa.table({
+            "post_date": pa.array([dates[d] for d in cols["post_date"]], pa.date32()),
+            "description": pa.array(cols["description"], pa.string()),
+            "amount_cents": pa.array(column_cents(cols["amount"]), pa.int64()),
+            "tx_type": pa.array(cols["tx_type"], pa.string()).dictionary_encode(),
+            "category": pa.array(cols["category"], pa.string()).dictionary_encode(),
+            "balance_cents": pa.array([None if b is None else to_cents(b) for b in cols["balance"]], pa.int64()),
+            "dq_flag": pa.array(cols["dq_flag"], pa.string()).dictionary_encode(),
+            "extraction_method": pa.array(cols["extraction_method"], pa.string()).dictionary_encode(),
+        })
+        # No source_file: it is the server-side upload path, not something to hand out
+        metadata = {
+            f"qc.{key}": json.dumps(audit_data.get(key), default=str)
+            for key in ("document_hash", "statement_metadata", "financials", "reconciliation")
+        }
+        table = table.replace_schema_metadata(metadata)
         
-        df = pd.DataFrame(flattened)
         output = BytesIO()
-        df.to_csv(output, index=False)
+        if target_format == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, output)
+        else:
+            with pa.ipc.new_file(output, table.schema) as writer:
+                writer.write_table(table)
         output.seek(0)
         return output
 
-    def _generate_text(self, transactions: List[Dict], audit_data: Dict[str, Any]) -> BytesIO:
+    def _generate_text(self, transactions: Union[List[Dict], TransactionBatch], audit_data: Dict[str, Any]) -> BytesIO:
         """Structured text export for debugging/preview"""
         output = BytesIO()
         lines = [f"QCONVERTER DOCUMENT REPORT - {audit_data.get('timestamp')}\n", "="*50 + "\n\n"]
         
-        for tx in transactions:
-            line = f"[{tx.get('post_date')}] {tx.get('description')[:40]:<40} | Amt: {tx.get('amount'):>10.2f} | Type: {tx.get('tx_type')} | Cat: {tx.get('category', 'N/A')}\n"
+        cols = self._columns(transactions)
+        for post_date, description, amount, tx_type, category in zip(
+                cols["post_date"], cols["description"], cols["amount"], cols["tx_type"], cols["category"]):
+            line = f"[{post_date}] {description[:40]:<40} | Amt: {amount:>10.2f} | Type: {tx_type} | Cat: {category}\n"
             lines.append(line)
             
         output.write("".join(lines).encode('utf-8'))
         output.seek(0)
         return output
-
-    def _auto_width(self, ws) -> None:
-        """Auto-adjust column widths"""
-        for col_idx, column in enumerate(ws.columns, 1):
-            max_length = 0
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 4, 60)
-
@@ -0,0 +1,104 @@
+"""
+Money - Integer-cents amount parsing and exact totals.
+
+Statement amounts are decimal strings ("$1,234.56", "(45.00)", "12.50-").
+parse_cents() turns them into signed integer cents without going through
+float: a translate table strips currency symbols, separators and spaces,
+the sign is read from a leading minus, enclosing parentheses or a trailing
+minus, and the digits are split at the decimal point. Results are cached,
+as statements repeat the same amounts.
+
+Transaction amounts stay floats (cents / 100, the nearest double to the
+printed value); totals and reconciliation convert back to cents and sum
+integers, so they cannot drift.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Characters dropped before the digits are read
+_STRIP_TABLE = str.maketrans('', '', '$£€¥,\'  \t')
+# Everything but the digits of an already-validated amount token
+_TOKEN_TABLE = str.maketrans('', '', '$,.()-')
+
+
+@lru_cache(maxsize=65536)
+def _parse(text: str) -> Optional[int]:
+    s = text.strip()
+    negative = False
+    if s.startswith('(') and s.endswith(')'):
+        negative, s = True, s[1:-1]
+    s = s.translate(_STRIP_TABLE)
+    if s.endswith('-'):
+        negative, s = True, s[:-1]
+    if s.startswith('-'):
+        negative, s = True, s[1:]
+    elif s.startswith('+'):
+        s = s[1:]
+
+    whole, _, frac = s.partition('.')
+    if not (whole or frac) or not (whole.isascii() and frac.isascii()):
+        return None
+    if (whole and not whole.isdigit()) or (frac and not frac.isdigit()):
+        return None
+
+    cents = int(whole or 0) * 100 + int((frac + '00')[:2])
+    if len(frac) > 2 and frac[2] >= '5':
+        cents += 1  # Round half up on the third decimal
+    return -cents if negative else cents
+
+
+def parse_cents(val: Any) -> Optional[int]:
+    """
+    Signed integer cents of an amount string, or None if it is not an amount.
+
+    "(45.00)", "-45.00" and "45.00-" are all -4500.
+    """
+    if val is None or val == "":
+        return None
+    if isinstance(val, int):
+        return val * 100
+    if isinstance(val, float):
+        return to_cents(val) if val == val else None
+    return _parse(str(val))
+
+
+def token_cents(token: str) -> int:
+    """
+    Signed cents of a token already matched as an amount with exactly two
+    decimals (e.g. by lexer.AMOUNT_RE): one translate and int(), no validation.
+    """
+    cents = int(token.translate(_TOKEN_TABLE))
+    return -cents if '-' in token or token[0] == '(' else cents
+
+
+def parse_amount(val: Any) -> float:
+    """Signed amount as a float (0.0 when val is empty or not an amount)."""
+    cents = parse_cents(val)
+    return cents / 100 if cents else 0.0
+
+
+def to_cents(amount: Optional[float]) -> int:
+    """Cents of a float amount that was produced from a 2-decimal value."""
+    return round(amount * 100) if amount else 0
+
+
+def sum_cents(amounts: Iterable[Optional[float]]) -> int:
+    """Exact integer-cents total of float amounts."""
+    return sum(map(to_cents, amounts))
+
+
+def column_cents(amounts) -> "np.ndarray":
+    """Vectorized to_cents for an array or pandas Series (NaN -> 0)."""
+    import numpy as np
+    values = np.nan_to_num(np.asarray(amounts, dtype=float))
+    return np.rint(values * 100).astype(np.int64)
+
+
+def parse_cents_series(values: "pd.Series") -> "pd.Series":
+    """Column-wise parse_cents: each distinct string is parsed once; non-amounts become 0."""
+    unique = values.unique()
+    return values.map(dict(zip(unique, (parse_cents(v) or 0 for v in unique)))).astype("int64")
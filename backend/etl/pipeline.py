@@ -4,104 +4,233 @@ ETL Pipeline Orchestrator - Coordinates Extract, Filter, Transform, DQ, and Load
 Flow: Extract → Filter → Transform → Categorize → DQ → Load
 
 Filter step separates transactions from metadata for accurate reconciliation.
+Extract through Categorize run page by page; DQ and Load see the whole document.
+
+One ETLPipeline serves concurrent conversions: everything a conversion
+mutates lives in a PipelineRun created per process() call, and the pipeline
+itself only holds read-only rules and internally locked caches.
 """
 import time
+import logging
 import os
+from io import BytesIO
 from datetime import datetime
-from typing import Dict, Any
-from .extract import ParserFactory
+from typing import Dict, Any, Optional, List, Tuple, Union
+from .extract import ParserFactory, LayoutRegistry, summarize_extraction
 from .transform import HeuristicTransformer
 from .filter import TransactionFilter
 from .dq import DataQualityEngine
 from .load import UniversalLoader
-from .categorize import CategoryMapper
+from .categorize import CategoryMapper, get_category_mapper, get_ruleset_cache_stats
+from .config import Config
+from .cache import CacheKey, ConversionCache
+from .results import ResultStore
+from .columnar import TransactionBatch
+from .dates import DateNormalizer
+from .money import column_cents, sum_cents
+
+
+# Bump whenever extraction/transform/load output changes so that cached
+# conversions produced by older rules are no longer served.
+PIPELINE_VERSION = "13"
+
+
+class PipelineRun:
+    """
+    Mutable state of one conversion: the transformer's column map and
+    fallback counters, the DQ engine's stats/flags/reconciliation, the
+    statement's date format and this run's category cache hits/misses.
+    """
+    
+    def __init__(self, category_mapper: CategoryMapper):
+        self.transformer = HeuristicTransformer()
+        self.dq_engine = DataQualityEngine()
+        self.date_normalizer = DateNormalizer()
+        self.category_mapper = category_mapper
+        self.category_tally = category_mapper.new_tally()
 
 
 class ETLPipeline:
     """
     Enterprise ETL Pipeline with Transaction Eligibility Filtering.
+    
+    Reentrant: process() may run on several threads at once.
     """
     
-    def __init__(self):
-        self.transformer = HeuristicTransformer()
+    def __init__(self, pdf_workers: int = Config.PDF_WORKERS, pages_per_task: int = Config.PDF_PAGES_PER_TASK,
+                 shared_layout: bool = Config.PDF_SHARED_LAYOUT, table_prescreen: bool = Config.PDF_TABLE_PRESCREEN,
+                 cache: Optional[ConversionCache] = None, columnar: bool = Config.COLUMNAR_BATCHES,
+                 results: Optional[ResultStore] = None):
+        """
+        Args:
+            pdf_workers: Process pool size for parallel PDF page extraction (0 = serial)
+            pages_per_task: Consecutive pages handed to each extraction worker
+            shared_layout: Derive table cells and text from one word-layout pass per page
+            table_prescreen: Skip table extraction on pages that cannot hold a transaction table
+            cache: Conversion cache; defaults to one sized from Config (None if disabled)
+            columnar: Run Filter → Categorize → DQ → Load on columnar TransactionBatches
+            results: Canonical result store for on-demand renderings; defaults to one
+                     from Config (None if disabled)
+        """
+        self.pdf_options = {
+            "max_workers": pdf_workers,
+            "pages_per_task": pages_per_task,
+            "shared_layout": shared_layout,
+            "table_prescreen": table_prescreen,
+            "layout_registry": LayoutRegistry(Config.LAYOUT_REGISTRY_PATH, Config.LAYOUT_MIN_CONFIDENCE)
+                               if Config.LAYOUT_REGISTRY_ENABLED else None
+        }
+        if cache is None and Config.CONVERSION_CACHE_ENABLED:
+            cache = ConversionCache(
+                max_bytes=Config.CONVERSION_CACHE_MAX_MB * 1024 * 1024,
+                ttl_seconds=Config.CONVERSION_CACHE_TTL_SECONDS
+            )
+        self.cache = cache
+        if results is None and Config.RESULT_STORE_ENABLED:
+            results = ResultStore(Config.RESULT_STORE_DIR, Config.RESULT_STORE_TTL_SECONDS,
+                                  Config.RESULT_STORE_SWEEP_SECONDS)
+        self.results = results
+        self.columnar = columnar
+        # Shared across runs: stateless after construction
         self.tx_filter = TransactionFilter()
-        self.dq_engine = DataQualityEngine()
         self.loader = UniversalLoader()
-        self.category_mapper = CategoryMapper()
+        self.category_mapper = get_category_mapper()
 
-    def process(self, file_path: str, file_type: str, target_format: str = "xlsx"):
+    def process(self, file_path: str, file_type: str, target_format: str = "xlsx",
+                document_hash: Optional[str] = None, category_rules: Optional[dict] = None,
+                output_path: Optional[str] = None):
         """
         Process a file through the complete ETL pipeline.
         Yields (percentage, message, result_dict)
+        
+        Args:
+            document_hash: SHA-256 of the file if the caller already computed it
+            category_rules: Account's category overrides ({category: [keywords]}), checked before the defaults
+            output_path: Write the output to this file (chunk by chunk for streaming formats)
+                         instead of returning it in "output_buffer"
         """
         start_time = time.time()
         
         try:
-            # ─── 1. Extract (0-20%) ───
+            parser = ParserFactory.get_parser(file_type, **self.pdf_options)
+            document_hash = document_hash or parser.get_file_hash(file_path)
+            run = PipelineRun(get_category_mapper(category_rules) if category_rules else self.category_mapper)
+            result_id = ResultStore.make_id(document_hash, run.category_mapper.version) if self.results else None
+            
+            # ─── 0. Conversion Cache ───
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(document_hash, target_format, PIPELINE_VERSION, run.category_mapper.version)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    result = cached["result"]
+                    result["stats"].update({
+                        "source_file": file_path,
+                        "processing_time_ms": (time.time() - start_time) * 1000,
+                        "timestamp": datetime.now().isoformat(),
+                        "cache_hit": True
+                    })
+                    if result_id:
+                        result["download_token"] = self._issue_download(
+                            result_id, result["preview_data"], result["stats"],
+                            store=not self.results.has(result_id, PIPELINE_VERSION))
+                    yield 100, "Done", {
+                        "success": True,
+                        **self._deliver_cached(cached["output"], output_path),
+                        **result
+                    }
+                    return
+            
+            # ─── 1-4. Extract → Transform → Filter → Categorize, page by page (10-55%) ───
+            # Each page is carried through the first four stages before the next
+            # is read, so only one page of fragments/text is held at a time.
             yield 10, "Reading Document...", None
-            parser = ParserFactory.get_parser(file_type)
-            raw_data = parser.parse(file_path)
-            yield 20, "Document Read Successful.", None
+            source_file = file_path
+            total_rows = 0
+            balances: Dict[str, float] = {}
+            eligible_transactions = []
+            metadata_rows = []
+            eligible_batches: List[TransactionBatch] = []
+            metadata_batches: List[TransactionBatch] = []
+            page_infos = []
+            for batch, rows in run.transformer.transform_stream(parser.iter_pages(file_path, document_hash)):
+                source_file = batch["source_file"]
+                page_infos.append(batch.get("extraction") or {})
+                run.date_normalizer.observe_text(batch["raw_text"])
+                total_rows += len(rows)
+                
+                if self.columnar:
+                    eligible, metadata, page_balances = self.tx_filter.split_batch(TransactionBatch.from_rows(rows))
+                    eligible.frame["category"] = run.category_mapper.categorize_column(eligible.frame["description"], run.category_tally)
+                    eligible_batches.append(eligible)
+                    metadata_batches.append(metadata)
+                    balances.update(page_balances)
+                else:
+                    # Filter: Separate Transactions from Metadata
+                    eligible, metadata, page_balances = self.tx_filter.split(rows)
+                    balances.update(page_balances)
+                    
+                    # Categorization Guardrail: only categorize eligible transactions
+                    categories = run.category_mapper.categorize_batch((tx.get("description", "") for tx in eligible), run.category_tally)
+                    for tx, category in zip(eligible, categories):
+                        tx["category"] = category
+                    
+                    eligible_transactions.extend(eligible)
+                    metadata_rows.extend(metadata)
+                
+                page_number, page_count = batch["page_number"], batch["page_count"]
+                yield 10 + int(45 * page_number / max(page_count, 1)), f"Processed page {page_number} of {page_count}...", None
             
-            # ─── 2. Transform (20-40%) ───
-            yield 25, "Extracting transactions...", None
-            all_rows = self.transformer.transform(raw_data)
-            yield 40, "Transformation Complete.", None
+            if self.columnar:
+                eligible_transactions = TransactionBatch.concat(eligible_batches)
+                metadata_rows = TransactionBatch.concat(metadata_batches)
             
-            # ─── 3. Filter: Separate Transactions from Metadata (40-55%) ───
-            yield 45, "Filtering eligible transactions...", None
-            eligible_transactions, metadata_rows, extracted_metadata = self.tx_filter.filter(all_rows)
+            # Dates: infer the statement's format once, then emit ISO dates
+            self._normalize_dates(run.date_normalizer, eligible_transactions, metadata_rows)
+            
+            extracted_metadata = self.tx_filter.summarize(eligible_transactions, metadata_rows, balances, total_rows)
             yield 55, f"Found {len(eligible_transactions)} transactions, {len(metadata_rows)} metadata rows.", None
-
-            # ─── 4. Categorization Guardrail (55-60%) ───
-            # Only categorize eligible transactions
-            yield 58, "Categorizing transactions...", None
-            for tx in eligible_transactions:
-                tx["category"] = self.category_mapper.categorize(tx.get("description", ""))
             
             # ─── 5. Data Quality (60-75%) ───
             yield 60, "Validating data...", None
-            eligible_transactions = self.dq_engine.assess(
-                eligible_transactions, 
-                metadata_rows=metadata_rows,
-                extracted_metadata=extracted_metadata
-            )
-            dq_stats = self.dq_engine.get_stats()
-            dq_report = self.dq_engine.get_full_report()
+            if self.columnar:
+                eligible_transactions = run.dq_engine.assess_batch(
+                    eligible_transactions,
+                    metadata_count=len(metadata_rows),
+                    extracted_metadata=extracted_metadata
+                )
+            else:
+                eligible_transactions = run.dq_engine.assess(
+                    eligible_transactions, 
+                    metadata_rows=metadata_rows,
+                    extracted_metadata=extracted_metadata
+                )
+            dq_stats = run.dq_engine.get_stats()
+            dq_report = run.dq_engine.get_full_report()
             yield 75, "Validation Complete.", None
             
             # ─── Summary & Audit Data ───
             processing_time = (time.time() - start_time) * 1000
             
-            total_debits = sum(tx.get("amount", 0) for tx in eligible_transactions if tx.get("tx_type") == "debit")
-            total_credits = sum(tx.get("amount", 0) for tx in eligible_transactions if tx.get("tx_type") == "credit")
+            total_debits, total_credits = self._totals(eligible_transactions)
             
             # ─── Anomaly Detection ───
-            seen_txs = set()
-            duplicates = 0
-            round_numbers = 0
-            
-            for tx in eligible_transactions:
-                key = (tx.get("post_date"), tx.get("description"), tx.get("amount"))
-                if key in seen_txs:
-                    duplicates += 1
-                else:
-                    seen_txs.add(key)
-                
-                amt = tx.get("amount", 0)
-                if amt > 0 and float(amt).is_integer():
-                    round_numbers += 1
+            round_numbers = self._round_amounts(eligible_transactions)
 
             audit_data = {
-                "document_hash": raw_data.get("document_hash"),
-                "source_file": raw_data.get("source_file"),
+                "document_hash": document_hash,
+                "source_file": source_file,
                 "processing_time_ms": processing_time,
                 "total_rows": len(eligible_transactions),
                 "metadata_rows": len(metadata_rows),
+                "extraction": summarize_extraction(page_infos),
+                "fallback": run.transformer.get_fallback_stats(),
+                "dates": run.date_normalizer.get_stats(),
+                "category_cache": run.category_mapper.tally_stats(run.category_tally),
                 "dq_stats": dq_stats,
                 "dq_report": dq_report,
                 "anomalies": {
-                    "duplicate_count": duplicates,
+                    "duplicate_count": dq_report["duplicates"]["count"],
                     "round_amounts": round_numbers
                 },
                 "timestamp": datetime.now().isoformat(),
@@ -112,21 +241,44 @@ class ETLPipeline:
                     "closing_balance": extracted_metadata.get("closing_balance", 0.0)
                 },
                 "reconciliation": dq_report.get("reconciliation", {}),
-                "statement_metadata": extracted_metadata
+                "statement_metadata": extracted_metadata,
+                "cache_hit": False
             }
             
             yield 85, "Preparing document...", None
-            output_buffer = self.loader.generate(eligible_transactions, audit_data, target_format)
+            if output_path:
+                try:
+                    with open(output_path, "wb") as f:
+                        self.loader.write(eligible_transactions, audit_data, target_format, f)
+                except Exception:
+                    if os.path.exists(output_path):
+                        os.remove(output_path)  # No half-written downloads
+                    raise
+                output = {"output_path": output_path, "output_buffer": None}
+            else:
+                output = {"output_buffer": self.loader.generate(eligible_transactions, audit_data, target_format)}
             yield 95, "Finalizing...", None
             
-            yield 100, "Done", {
-                "success": True,
-                "output_buffer": output_buffer,
+            if self.columnar:
+                eligible_transactions = eligible_transactions.to_rows()
+                metadata_rows = metadata_rows.to_rows()
+            
+            result = {
                 "stats": audit_data,
                 "preview_data": eligible_transactions,
                 "metadata_rows": metadata_rows,
                 "summary": audit_data.get("summary_highlights")
             }
+            if cache_key is not None:
+                self._cache_output(cache_key, output, result)
+            # Issued per conversion, after caching: a cache hit must never hand out another requester's token
+            result["download_token"] = self._issue_download(result_id, eligible_transactions, audit_data) if result_id else None
+            
+            yield 100, "Done", {
+                "success": True,
+                **output,
+                **result
+            }
             
         except Exception as e:
             logging.exception("PIPELINE_ERROR")
@@ -136,3 +288,99 @@ class ETLPipeline:
                 "stats": {}
             }
 
+    def _issue_download(self, result_id: str, transactions: List[Dict], audit_data: Dict[str, Any],
+                        store: bool = True) -> Optional[str]:
+        """
+        Save the canonical result (unless store is False) and return a new
+        download token for it; a storage failure only costs the on-demand renderings.
+        """
+        try:
+            if store:
+                self.results.put(result_id, transactions, audit_data, PIPELINE_VERSION)
+            return self.results.issue_token(result_id)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"RESULT_STORE: could not save {result_id}: {e}")
+            return None
+
+    def render(self, download_token: str, target_format: str) -> Optional[str]:
+        """
+        File path of the result a download token was issued for, rendered as
+        target_format (rendered once, then reused).
+
+        Returns:
+            None if the token or result is unknown, expired, from another pipeline
+            version, or the store is disabled. Raises ValueError for malformed tokens/formats.
+        """
+        if self.results is None:
+            return None
+        result_id = self.results.resolve(download_token)
+        if result_id is None:
+            return None
+        return self.results.render(result_id, target_format, self.loader, PIPELINE_VERSION)
+
+    @staticmethod
+    def _deliver_cached(data: bytes, output_path: Optional[str]) -> Dict[str, Any]:
+        """Result output fields for a cached rendering: written to output_path or as a buffer."""
+        if not output_path:
+            return {"output_buffer": BytesIO(data)}
+        with open(output_path, "wb") as f:
+            f.write(data)
+        return {"output_path": output_path, "output_buffer": None}
+
+    def _cache_output(self, cache_key: CacheKey, output: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store the rendering; a file output is read back only if it can fit the cache."""
+        if output["output_buffer"] is not None:
+            self.cache.put(cache_key, output["output_buffer"].getvalue(), result)
+        elif os.path.getsize(output["output_path"]) <= self.cache.max_bytes:
+            with open(output["output_path"], "rb") as f:
+                self.cache.put(cache_key, f.read(), result)
+
+    @staticmethod
+    def _normalize_dates(normalizer: DateNormalizer, *groups: Union[List[Dict], TransactionBatch],
+                         sample_size: int = 500) -> None:
+        """Infer the date format from the eligible rows, then rewrite post_date in place."""
+        eligible = groups[0]
+        if isinstance(eligible, TransactionBatch):
+            normalizer.infer(eligible.frame["post_date"].head(sample_size))
+            for batch in groups:
+                if len(batch):
+                    batch.frame["post_date"] = normalizer.normalize_column(batch.frame["post_date"])
+            return
+        
+        normalizer.infer(tx.get("post_date", "") for tx in eligible[:sample_size])
+        for rows in groups:
+            for tx in rows:
+                if tx.get("post_date"):
+                    tx["post_date"] = normalizer.normalize(tx["post_date"])
+
+    @staticmethod
+    def _totals(transactions: Union[List[Dict], TransactionBatch]) -> Tuple[float, float]:
+        """(total_debits, total_credits) of the eligible transactions, summed in integer cents."""
+        if isinstance(transactions, TransactionBatch):
+            cents, tx_types = column_cents(transactions.frame["amount"]), transactions.frame["tx_type"].to_numpy()
+            return int(cents[tx_types == "debit"].sum()) / 100, int(cents[tx_types == "credit"].sum()) / 100
+        debit_cents = sum_cents(tx.get("amount", 0) for tx in transactions if tx.get("tx_type") == "debit")
+        credit_cents = sum_cents(tx.get("amount", 0) for tx in transactions if tx.get("tx_type") == "credit")
+        return debit_cents / 100, credit_cents / 100
+
+    @staticmethod
+    def _round_amounts(transactions: Union[List[Dict], TransactionBatch]) -> int:
+        """Round-amount anomaly counter (duplicates come from the DQ report)."""
+        if isinstance(transactions, TransactionBatch):
+            amounts = transactions.frame["amount"]
+            return int(((amounts > 0) & (amounts % 1 == 0)).sum())
+        
+        round_numbers = 0
+        for tx in transactions:
+            amt = tx.get("amount", 0)
+            if amt > 0 and float(amt).is_integer():
+                round_numbers += 1
+        return round_numbers
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy of the conversion, rule-set and merchant caches and the result store."""
+        stats = self.cache.get_stats() if self.cache is not None else {"enabled": False}
+        stats["category_rulesets"] = get_ruleset_cache_stats()
+        stats["category_cache"] = self.category_mapper.get_cache_stats()
+        stats["results"] = self.results.get_stats() if self.results is not None else {"enabled": False}
+        return stats
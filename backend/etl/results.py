@@ -0,0 +1,224 @@
+"""
+Result Store - Canonical conversion results, rendered to any format on demand.
+
+A finished run is saved once as its canonical form: the eligible
+transactions plus audit_data, as JSON under a result id derived from the
+document hash and the category rules version (an account's custom rules
+never share a result with the defaults). Any supported output format can
+then be rendered from that record by UniversalLoader without re-running
+extraction; each rendering is written next to the record and served from
+disk on later requests.
+
+Records live on disk so every worker process sees them. Writes go to a
+temp file and are moved into place, so concurrent renders of the same
+format are safe. Records older than the TTL, or written by another
+PIPELINE_VERSION, are treated as missing; renderings carry the
+PIPELINE_VERSION in their file name, so a deploy that bumps it never serves
+an old rendering. put() also sweeps expired records and renderings from
+the directory (at most once per sweep interval), so results that are never
+requested again do not stay on disk.
+
+Result ids are derived from the document, so they are not secrets. Each
+conversion is instead issued its own random download token (valid for the
+TTL); only a token leads back to a result.
+"""
+import glob
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_RESULT_ID_RE = re.compile(r'^[0-9a-f]{64}-[0-9a-f]{16}$')
+# secrets.token_urlsafe(32)
+_TOKEN_RE = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+class ResultStore:
+    """
+    Usage:
+        store = ResultStore("outputs/results")
+        result_id = store.make_id(document_hash, mapper.version)
+        store.put(result_id, transactions, audit_data, PIPELINE_VERSION)
+        token = store.issue_token(result_id)                                 # handed to the requester
+        path = store.render(store.resolve(token), "csv", loader, PIPELINE_VERSION)
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = 86400, sweep_interval_seconds: float = 3600):
+        """
+        Args:
+            directory: Where records and renderings are kept (created on first write)
+            ttl_seconds: Records (and their renderings) older than this are dropped
+            sweep_interval_seconds: Min time between two sweeps of expired files
+        """
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.stored = 0
+        self.renders = 0
+        self.render_hits = 0
+        self.misses = 0
+        self.swept = 0
+
+    @staticmethod
+    def make_id(document_hash: str, rules_version: str) -> str:
+        return f"{document_hash}-{rules_version}"
+
+    def put(self, result_id: str, transactions: List[Dict[str, Any]], audit_data: Dict[str, Any],
+            pipeline_version: str) -> None:
+        """Save the canonical result (renderings older than it are no longer served)."""
+        self._check_id(result_id)
+        record = {"pipeline_version": pipeline_version, "transactions": transactions, "audit_data": audit_data}
+        self._write_atomic(self._record_path(result_id),
+                           lambda f: f.write(json.dumps(record, default=str).encode("utf-8")))
+        with self._lock:
+            self.stored += 1
+            sweep_due = time.time() - self._last_sweep >= self.sweep_interval_seconds
+            if sweep_due:
+                self._last_sweep = time.time()
+        if sweep_due:
+            self.sweep()
+
+    def issue_token(self, result_id: str) -> str:
+        """New unguessable download token for result_id, valid for the TTL."""
+        self._check_id(result_id)
+        token = secrets.token_urlsafe(32)
+        self._write_atomic(self._token_path(token), lambda f: f.write(result_id.encode("ascii")))
+        return token
+
+    def resolve(self, token: str) -> Optional[str]:
+        """
+        The result id a token was issued for.
+        
+        Returns:
+            Result id, or None for an unknown or expired token
+        Raises:
+            ValueError: token is malformed
+        """
+        if not _TOKEN_RE.match(token or ""):
+            raise ValueError("Invalid download token")
+        path = self._token_path(token)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                result_id = f.read().decode("ascii")
+        except (OSError, UnicodeDecodeError):
+            return None
+        return result_id if _RESULT_ID_RE.match(result_id) else None
+
+    def has(self, result_id: str, pipeline_version: str) -> bool:
+        return self.get(result_id, pipeline_version) is not None
+
+    def get(self, result_id: str, pipeline_version: str) -> Optional[Dict[str, Any]]:
+        """The stored {"transactions", "audit_data"}, or None if missing, stale or expired."""
+        self._check_id(result_id)
+        path = self._record_path(result_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self._drop(result_id)
+                return None
+            with open(path, "rb") as f:
+                record = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if record.get("pipeline_version") != pipeline_version:
+            return None
+        return record
+
+    def render(self, result_id: str, target_format: str, loader, pipeline_version: str) -> Optional[str]:
+        """
+        Path of result_id rendered as target_format, rendering it on first request.
+
+        Returns:
+            File path, or None when there is no current record for result_id
+        """
+        self._check_id(result_id)
+        if target_format not in loader.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported output format: {target_format}")
+        path = os.path.join(self.directory, f"{result_id}.v{pipeline_version}.{target_format}")
+        try:
+            record_mtime = os.path.getmtime(self._record_path(result_id))
+            if os.path.getmtime(path) >= record_mtime and time.time() - record_mtime <= self.ttl_seconds:
+                with self._lock:
+                    self.render_hits += 1
+                return path
+        except OSError:
+            pass  # Not rendered yet (or no record)
+
+        record = self.get(result_id, pipeline_version)
+        if record is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._write_atomic(path, lambda f: loader.write(record["transactions"], record["audit_data"], target_format, f))
+        with self._lock:
+            self.renders += 1
+        return path
+
+    def sweep(self) -> int:
+        """Delete records, renderings, tokens and leftover temp files older than the TTL; returns the count."""
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass  # Removed by another worker, or replaced since listing
+        with self._lock:
+            self.swept += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "ttl_seconds": self.ttl_seconds,
+            "stored": self.stored,
+            "renders": self.renders,
+            "render_hits": self.render_hits,
+            "misses": self.misses,
+            "swept": self.swept
+        }
+
+    def _record_path(self, result_id: str) -> str:
+        return os.path.join(self.directory, f"{result_id}.json")
+
+    def _token_path(self, token: str) -> str:
+        return os.path.join(self.directory, f"{token}.token")
+
+    @staticmethod
+    def _check_id(result_id: str) -> None:
+        # Ids become file names: only the exact make_id() shape is accepted
+        if not _RESULT_ID_RE.match(result_id or ""):
+            raise ValueError(f"Invalid result id: {result_id!r}")
+
+    def _write_atomic(self, path: str, write) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _drop(self, result_id: str) -> None:
+        for path in glob.glob(os.path.join(self.directory, glob.escape(result_id) + ".*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -22,12 +22,12 @@ class Transaction(TypedDict):
     - Java: POJO with Jackson annotations
     - Database: Normalized table schema
     """
-    post_date: str                # Normalized date (MM/DD/YYYY)
+    post_date: str                # ISO 8601 date (YYYY-MM-DD); raw text if unparseable
     description: str              # Cleaned description (max 100 chars)
     amount: float                 # Absolute transaction value
     tx_type: str                  # 'debit' | 'credit' | 'balance'
     category: str                 # 'Uncategorized' | 'Summary'
-    balance: Optional[float]      # Running balance if available
+    balance: Optional[float]      # Running balance if available (negative when overdrawn)
     metadata: TransactionMetadata
 
 class ExtractionPayload(TypedDict):
@@ -36,6 +36,18 @@ class ExtractionPayload(TypedDict):
     fragments: List[Dict]         # Table rows with page numbers
     raw_text: str                 # Full text for heuristic fallback
     source_file: str              # Original filename
+    pages: List[Dict]             # Per-page {page_number, raw_text} (PDF only; lets Pass 2 skip table-covered lines)
+
+class PageBatch(TypedDict):
+    """Per-page unit yielded by the streaming Extract API (BaseParser.iter_pages)"""
+    document_hash: str            # SHA256 for idempotency
+    source_file: str              # Original filename
+    page_number: int              # 1-based page index
+    page_count: int               # Total pages in the document
+    fragments: List[Dict]         # Table rows found on this page
+    raw_text: str                 # This page's text for heuristic fallback
+    extraction: Dict[str, Any]    # Table pre-screen decision and timings ({} if n/a)
+    frame: Optional[Any]          # DataFrame chunk for vectorized tabular sources (None otherwise)
 
 class PipelineResult(TypedDict):
     """Final output from ETL pipeline"""
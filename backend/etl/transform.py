@@ -5,24 +5,65 @@ This module implements:
 1. Header detection for table column mapping
 2. Regex-based heuristic fallback for raw text
 3. Transaction type detection (debit/credit/balance)
-4. Deduplication using signature hashing
+4. Signature matching so Pass 2 does not re-add rows the tables produced
+
+Repeated transactions are kept: the DQ engine's DuplicateDetector flags
+them, rather than this layer dropping them unseen.
 """
 import re
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from .schema import Transaction, ExtractionPayload
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, TYPE_CHECKING
+from .schema import Transaction, ExtractionPayload, PageBatch
+from .lexer import lex_line, LexedLine, DATE_RE
+from .keywords import KeywordMatcher
+from .money import parse_amount, parse_cents_series
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Keyword rule sets, compiled once (groups are checked in order; first match wins)
+HEADER_KEYWORDS = KeywordMatcher([
+    ("header", ['date', 'description', 'debit', 'credit', 'balance', 'amount', 'check'])
+])
+COLUMN_KEYWORDS = KeywordMatcher([
+    ("date", ['date']),
+    ("description", ['description', 'details', 'check', 'vendor', 'payee']),
+    ("debit", ['debit', 'withdrawal']),
+    ("credit", ['credit', 'deposit']),
+    ("balance", ['balance']),
+    ("amount", ['amount']),
+])
+# Preferred date column when a header has several ('Trans Date', 'Posting Date', 'Effective Date')
+PREFERRED_DATE_KEYWORDS = KeywordMatcher([("preferred", ['tran', 'post', 'eff'])])
+TX_TYPE_KEYWORDS = KeywordMatcher([
+    ("credit", ['deposit', 'credit', 'refund', 'transfer in', 'payment received',
+                'direct deposit', 'interest', 'cashback', 'reward']),
+    ("debit", ['withdrawal', 'debit', 'payment', 'purchase', 'fee', 'charge',
+               'atm', 'pos', 'transfer out', 'bill pay', 'check']),
+])
 
 
 class HeuristicTransformer:
     """
     Deterministic transformer using regex patterns.
     No AI, no ML - pure pattern matching for reproducible results.
+    
+    An instance holds one document's state (column map, fallback counters),
+    so concurrent conversions each use their own; the compiled patterns and
+    keyword matchers are shared, read-only class/module state.
     """
     
+    date_pattern = DATE_RE
+    amount_pattern = re.compile(r'[$]?[\d,]+\.\d{1,2}')
+    # Presence test equivalent to date_pattern.search, without capture groups for pandas
+    _date_presence = r'\d{1,2}[/-]\d{1,2}'
+    
     def __init__(self):
-        self.date_pattern = re.compile(r'(\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?)')
-        self.amount_pattern = re.compile(r'[$]?[\d,]+\.\d{1,2}')
         self.column_map: Dict[str, int] = {}
+        self.fallback_stats: Dict[str, int] = {}
+        self._reset_fallback_stats()
 
     def transform(self, raw_data: Dict[str, Any]) -> List[Transaction]:
         """
@@ -39,10 +80,61 @@ class HeuristicTransformer:
         raw_text = raw_data.get("raw_text", "")
         
         results: List[Transaction] = []
-        seen_sigs: set = set()
+        table_sigs: Counter = Counter()
+        covered: Dict[Any, Counter] = {}
         self.column_map = {}
+        self._reset_fallback_stats()
+
+        self._transform_fragments(fragments, source_id, table_sigs, results, covered)
+        
+        # Page-aware payloads let Pass 2 skip what the tables already produced
+        pages = raw_data.get("pages")
+        if pages:
+            for page in pages:
+                self._transform_raw_text(page["raw_text"], source_id, table_sigs, results,
+                                         covered.get(page["page_number"]))
+        else:
+            self._transform_raw_text(raw_text, source_id, table_sigs, results)
+
+        return results
 
-        # Pass 1: Table fragments (high confidence)
+    def transform_stream(self, batches: Iterable[PageBatch]) -> Iterator[Tuple[PageBatch, List[Transaction]]]:
+        """
+        Streaming entry point: transform one PageBatch at a time.
+        
+        The column map and table row signatures carry across pages, so a
+        header found on page 1 still maps the rows on page 2.
+        
+        Yields:
+            (batch, transactions found on that page)
+        """
+        table_sigs: Counter = Counter()
+        self.column_map = {}
+        self._reset_fallback_stats()
+
+        for batch in batches:
+            source_id = batch.get("document_hash", "unknown")
+            results: List[Transaction] = []
+            covered: Dict[Any, Counter] = {}
+            if batch.get("frame") is not None:
+                self._transform_frame(batch["frame"], source_id, table_sigs, results,
+                                      include_header=batch.get("page_number") == 1)
+            self._transform_fragments(batch.get("fragments", []), source_id, table_sigs, results, covered)
+            self._transform_raw_text(batch.get("raw_text", ""), source_id, table_sigs, results,
+                                     sum(covered.values(), Counter()))
+            yield batch, results
+
+    def _transform_fragments(self, fragments: List[Dict], source_id: str,
+                             table_sigs: Counter, results: List[Transaction],
+                             covered: Optional[Dict[Any, Counter]] = None) -> None:
+        """
+        Pass 1: Table fragments (high confidence)
+        
+        Every mapped row is kept, repeats included, and its signature is
+        counted in table_sigs for Pass 2. When covered is given, the (date,
+        amount) of every table transaction is recorded under its fragment's
+        page_number as well.
+        """
         for frag in fragments:
             if frag["type"] == "table_row":
                 row = frag["data"]
@@ -52,20 +144,61 @@ class HeuristicTransformer:
                     continue
                 
                 tx = self._map_table_row_by_position(row, source_id)
-                if tx and self._get_sig(tx) not in seen_sigs:
+                if tx and covered is not None:
+                    covered.setdefault(frag.get("page_number"), Counter())[(tx["post_date"], tx["amount"])] += 1
+                if tx:
                     results.append(tx)
-                    seen_sigs.add(self._get_sig(tx))
+                    table_sigs[self._get_sig(tx)] += 1
 
-        # Pass 2: Raw text fallback (recovery)
+    def _transform_raw_text(self, raw_text: str, source_id: str,
+                            table_sigs: Counter, results: List[Transaction],
+                            covered_keys: Optional[Counter] = None) -> None:
+        """
+        Pass 2: Raw text fallback (recovery)
+        
+        On a page with table coverage, a transaction line is skipped while a
+        table row with the same (date, amount) is still unclaimed; balance
+        lines and anything the tables missed are still parsed. A parsed line
+        whose signature matches a not-yet-claimed table row is the same
+        transaction read twice and is dropped; lines repeating each other
+        are kept.
+        """
+        if not raw_text:
+            return
+        stats = self.fallback_stats
+        stats["pages"] += 1
+        if covered_keys:
+            stats["pages_with_tables"] += 1
+        
         for line in raw_text.split('\n'):
-            tx = self._parse_line_heuristic(line, source_id)
+            lexed = lex_line(line)
+            if lexed is None:
+                continue
+            stats["lines"] += 1
+            if covered_keys and lexed.kind == 'transaction' and lexed.date is not None:
+                tx_amount = lexed.amounts[-2] if len(lexed.amounts) >= 2 else lexed.amounts[0]
+                key = (lexed.date, abs(tx_amount))
+                if covered_keys[key] > 0:
+                    covered_keys[key] -= 1
+                    stats["lines_skipped"] += 1
+                    continue
+            
+            tx = self._tx_from_lexed(lexed, source_id)
             if tx:
                 sig = self._get_sig(tx)
-                if sig not in seen_sigs:
+                if table_sigs[sig] > 0:
+                    table_sigs[sig] -= 1
+                else:
                     results.append(tx)
-                    seen_sigs.add(sig)
 
-        return results
+    def _reset_fallback_stats(self) -> None:
+        self.fallback_stats = {"pages": 0, "pages_with_tables": 0, "lines": 0, "lines_skipped": 0}
+
+    def get_fallback_stats(self) -> Dict[str, Any]:
+        """Raw-text fallback counters for the last run, with the skipped fraction of candidate lines."""
+        stats = dict(self.fallback_stats)
+        stats["skipped_fraction"] = round(stats["lines_skipped"] / stats["lines"], 4) if stats.get("lines") else 0.0
+        return stats
 
     # ─────────────────────────────────────────────────────────────
     # Table Parsing
@@ -74,9 +207,7 @@ class HeuristicTransformer:
     def _is_header_row(self, row: List[Any]) -> bool:
         """Detect header rows by keyword count"""
         row_text = ' '.join([str(c).lower() for c in row if c])
-        keywords = ['date', 'description', 'debit', 'credit', 'balance', 'amount', 'check']
-        matches = sum(1 for kw in keywords if kw in row_text)
-        return matches >= 2
+        return len(HEADER_KEYWORDS.hits(row_text)) >= 2
 
     def _build_column_map(self, header_row: List[Any]) -> None:
         """Build column index mapping from header row"""
@@ -85,21 +216,14 @@ class HeuristicTransformer:
             if not cell:
                 continue
             cell_lower = str(cell).lower().strip()
+            field = COLUMN_KEYWORDS.first(cell_lower)
             
             # Prioritize 'transaction' or 'post' date if multiple date columns exist
-            if 'date' in cell_lower:
-                if 'date' not in self.column_map or any(k in cell_lower for k in ['tran', 'post', 'eff']):
+            if field == 'date':
+                if 'date' not in self.column_map or PREFERRED_DATE_KEYWORDS.first(cell_lower):
                     self.column_map['date'] = i
-            elif any(k in cell_lower for k in ['description', 'details', 'check', 'vendor', 'payee']):
-                self.column_map['description'] = i
-            elif 'debit' in cell_lower or 'withdrawal' in cell_lower:
-                self.column_map['debit'] = i
-            elif 'credit' in cell_lower or 'deposit' in cell_lower:
-                self.column_map['credit'] = i
-            elif 'balance' in cell_lower:
-                self.column_map['balance'] = i
-            elif 'amount' in cell_lower:
-                self.column_map['amount'] = i
+            elif field:
+                self.column_map[field] = i
 
     def _map_table_row_by_position(self, row: List[Any], source_id: str) -> Optional[Transaction]:
         """Map table cells to transaction fields using column index map"""
@@ -108,25 +232,27 @@ class HeuristicTransformer:
             
         date_val = self._safe_get(row, self.column_map.get('date'))
         desc_val = self._safe_get(row, self.column_map.get('description'))
+        # A negative debit ("(3.00)", "3.00-") is money in, a negative credit money out
         debit_val = self._parse_amount(self._safe_get(row, self.column_map.get('debit')))
         credit_val = self._parse_amount(self._safe_get(row, self.column_map.get('credit')))
+        if debit_val < 0 or credit_val < 0:
+            debit_val, credit_val = max(debit_val, 0.0) + max(-credit_val, 0.0), max(credit_val, 0.0) + max(-debit_val, 0.0)
         balance_val = self._parse_amount(self._safe_get(row, self.column_map.get('balance')))
         amount_val = self._parse_amount(self._safe_get(row, self.column_map.get('amount')))
 
         # Heuristic if debit/credit are merged in one 'amount' column
         if debit_val == 0 and credit_val == 0:
-            if amount_val != 0:
-                # Use mapped amount column if available
-                debit_val = amount_val
+            if amount_val < 0:
+                # Negative (parenthesized / trailing minus) amounts are debits
+                debit_val = -amount_val
+            elif amount_val > 0:
+                if self._detect_tx_type(desc_val or "") == 'credit':
+                    credit_val = amount_val
+                else:
+                    debit_val = amount_val
             else:
                 # Fallback to scanning all cells
-                for i, cell in enumerate(row):
-                    cell_str = str(cell).lower()
-                    if self.amount_pattern.search(cell_str):
-                        val = self._parse_amount(cell_str)
-                        if val != 0:
-                            debit_val = val
-                            break
+                debit_val = self._scan_row_amount(row)
         
         # Validate: must have date
         if not date_val or not self.date_pattern.search(str(date_val)):
@@ -161,40 +287,124 @@ class HeuristicTransformer:
             }
         }
 
+    def _transform_frame(self, frame: "pd.DataFrame", source_id: str, table_sigs: Counter,
+                         results: List[Transaction], include_header: bool = True) -> None:
+        """
+        Vectorized Pass 1 for tabular sources (CSV chunks).
+        
+        The column map is built once from the header and every field is parsed
+        column-wise with the same rules as _map_table_row_by_position. Empty
+        cells count as 0 rather than NaN. Without a usable header the chunk
+        goes through the per-row fragment path instead. Tabular sources have
+        no raw text for Pass 2, so row signatures are not recorded here.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        header = [str(c) for c in frame.columns]
+        if 'date' not in self.column_map and self._is_header_row(header):
+            self._build_column_map(header)
+        
+        if 'date' not in self.column_map:
+            rows = ([header] if include_header else []) + frame.values.tolist()
+            self._transform_fragments([{"type": "table_row", "data": row} for row in rows],
+                                      source_id, table_sigs, results)
+            return
+        if frame.empty:
+            return
+        
+        def column(field: str) -> "pd.Series":
+            idx = self.column_map.get(field)
+            if idx is None or idx >= frame.shape[1]:
+                return pd.Series("", index=frame.index)
+            return frame.iloc[:, idx].astype(str).str.strip()
+        
+        dates = column('date')
+        descs = column('description').str.slice(0, 100).str.strip()
+        # A negative debit is money in, a negative credit money out
+        raw_debit = self._parse_amount_series(column('debit'))
+        raw_credit = self._parse_amount_series(column('credit'))
+        debit = raw_debit.clip(lower=0) + (-raw_credit).clip(lower=0)
+        credit = raw_credit.clip(lower=0) + (-raw_debit).clip(lower=0)
+        balance = self._parse_amount_series(column('balance'))
+        amount_col = self._parse_amount_series(column('amount'))
+        
+        # Heuristic if debit/credit are merged in one 'amount' column:
+        # negative amounts are debits, positive ones follow the description
+        merged = (debit == 0) & (credit == 0)
+        positive = merged & (amount_col > 0)
+        if positive.any():
+            is_credit_kw = pd.Series(False, index=frame.index)
+            is_credit_kw[positive] = [self._detect_tx_type(d) == 'credit' for d in descs[positive]]
+            credit = credit.mask(is_credit_kw, amount_col)
+        else:
+            is_credit_kw = positive
+        debit = debit.mask(merged & (amount_col != 0) & ~is_credit_kw, amount_col.abs())
+        rescan = merged & (amount_col == 0)
+        if rescan.any():
+            # Rare rows with no mapped amount: scan all cells like the per-row path
+            debit.loc[rescan] = [self._scan_row_amount(row) for row in frame.loc[rescan].values.tolist()]
+        
+        # Validate: must have date
+        keep = dates.str.contains(self._date_presence, regex=True)
+        
+        # Determine transaction type
+        is_credit = (credit > 0) & (debit == 0)
+        is_debit = ~is_credit & (debit > 0)
+        amount = np.where(is_credit, credit, np.where(is_debit, debit, np.where(credit != 0, credit, debit)))
+        tx_types = np.where(is_credit, 'credit', 'debit').astype(object)
+        undecided = (~is_credit & ~is_debit).to_numpy()
+        if undecided.any():
+            tx_types[undecided] = [self._detect_tx_type(d) for d in descs[undecided]]
+        
+        # Skip summary rows
+        keep &= ~((amount == 0) & (balance != 0))
+        
+        timestamp = datetime.now().isoformat()
+        mask = keep.to_numpy()
+        for date_val, desc_val, amt, tx_type, bal in zip(dates[mask], descs[mask], amount[mask],
+                                                        tx_types[mask], balance[mask]):
+            tx = {
+                "post_date": date_val,
+                "description": desc_val,
+                "amount": float(amt),
+                "tx_type": tx_type,
+                "category": "Uncategorized",
+                "balance": float(bal) if bal else None,
+                "metadata": {
+                    "source_file_id": source_id,
+                    "extraction_method": "table",
+                    "dq_flag": "clean",
+                    "processing_timestamp": timestamp
+                }
+            }
+            results.append(tx)
+
+    def _scan_row_amount(self, row: List[Any]) -> float:
+        """First non-zero amount-looking cell in a row (per-row fallback)."""
+        for cell in row:
+            cell_str = str(cell).lower()
+            if self.amount_pattern.search(cell_str):
+                val = abs(self._parse_amount(cell_str))
+                if val != 0:
+                    return val
+        return 0.0
+
     # ─────────────────────────────────────────────────────────────
     # Raw Text Heuristic Parsing
     # ─────────────────────────────────────────────────────────────
 
     def _parse_line_heuristic(self, line: str, source_id: str) -> Optional[Transaction]:
-        """Parse raw text line using regex patterns."""
-        line_clean = line.strip()
-        if not line_clean:
+        """Parse raw text line from its lexer tokens."""
+        lexed = lex_line(line)
+        if lexed is None:
             return None
+        return self._tx_from_lexed(lexed, source_id)
 
-        alpha_date_pattern = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}(,?\s+\d{2,4})?', re.I)
-        
-        date_match = self.date_pattern.search(line_clean)
-        if not date_match:
-            date_match = alpha_date_pattern.search(line_clean)
-            
-        if not date_match:
-            if any(kw in line_clean.lower() for kw in ['opening balance', 'beginning balance', 'ending balance']):
-                date_val = datetime.now().strftime("%m/%d/%Y") 
-            else:
-                return None
-        else:
-            date_val = date_match.group(0)
-
-        prefix = line_clean[:date_match.start()].strip() if date_match else ""
-        suffix = line_clean[date_match.end():].strip() if date_match else line_clean
-
-        amount_pattern = re.compile(r'\$?[\d,]+\.\d{2}')
-        amounts = amount_pattern.findall(suffix)
-        
-        if not amounts:
-            return None
-            
-        parsed_amounts = [self._parse_amount(a) for a in amounts]
+    def _tx_from_lexed(self, lexed: LexedLine, source_id: str) -> Optional[Transaction]:
+        """Build a heuristic Transaction from one lexed line (None for skip/noise lines)."""
+        date_val = lexed.date or datetime.now().strftime("%m/%d/%Y")
+        parsed_amounts = lexed.amounts
         
         if len(parsed_amounts) >= 2:
             tx_amount = parsed_amounts[-2]
@@ -202,33 +412,22 @@ class HeuristicTransformer:
         else:
             tx_amount = parsed_amounts[0]
             balance_val = None
-            
-        desc_parts = suffix
-        for amt in amounts:
-            desc_parts = desc_parts.replace(amt, '')
         
-        full_desc = f"{prefix} {desc_parts}".strip()
-        full_desc = ' '.join(full_desc.split())
-
+        full_desc = lexed.description
         if len(full_desc) < 3 and tx_amount == 0:
             return None
-            
-        desc_lower = full_desc.lower()
-        skip_patterns = ['your payment will be', 'statement period', 'total credits', 'total debits']
-        if any(p in desc_lower for p in skip_patterns):
+        if lexed.kind == 'skip':
             return None
         
-        balance_patterns = ['previous balance', 'ending balance', 'opening balance', 'beginning balance']
-        is_balance_row = any(bp in desc_lower for bp in balance_patterns)
-        
+        is_balance_row = lexed.kind == 'balance'
         if is_balance_row:
             final_balance = balance_val if balance_val is not None else tx_amount
             final_tx_amount = 0
             tx_type = 'balance'
         else:
-            final_tx_amount = tx_amount
+            final_tx_amount = abs(tx_amount)
             final_balance = balance_val
-            tx_type = self._detect_tx_type(full_desc)
+            tx_type = 'debit' if tx_amount < 0 else self._detect_tx_type(full_desc)
 
         return {
             "post_date": date_val,
@@ -255,25 +454,15 @@ class HeuristicTransformer:
         return str(row[idx]).strip() if row[idx] else ""
 
     def _parse_amount(self, val: Any) -> float:
-        if not val:
-            return 0.0
-        val_str = str(val).replace('$', '').replace(',', '').replace('(', '-').replace(')', '').strip()
-        try:
-            return abs(float(val_str))
-        except:
-            return 0.0
+        """Signed amount of a cell; '(45.00)' and '45.00-' are negative, non-amounts are 0.0."""
+        return parse_amount(val)
+
+    def _parse_amount_series(self, values: "pd.Series") -> "pd.Series":
+        """Column-wise _parse_amount: unparseable or empty cells become 0.0."""
+        return parse_cents_series(values) / 100
 
     def _get_sig(self, tx: Transaction) -> str:
         return f"{tx['post_date']}|{tx['amount']}|{tx['description'][:30]}"
 
     def _detect_tx_type(self, description: str) -> str:
-        desc_lower = description.lower()
-        credit_keywords = ['deposit', 'credit', 'refund', 'transfer in', 'payment received', 
-                           'direct deposit', 'interest', 'cashback', 'reward']
-        debit_keywords = ['withdrawal', 'debit', 'payment', 'purchase', 'fee', 'charge',
-                          'atm', 'pos', 'transfer out', 'bill pay', 'check']
-        for kw in credit_keywords:
-            if kw in desc_lower: return 'credit'
-        for kw in debit_keywords:
-            if kw in desc_lower: return 'debit'
-        return 'debit'
+        return TX_TYPE_KEYWORDS.first(description.lower()) or 'debit'
@@ -0,0 +1,88 @@
+"""
+Warm Start - Pre-import heavy dependencies and compile rule sets before serving.
+
+The ETL package imports pdfplumber, pandas/NumPy and openpyxl lazily, inside
+the stage that needs them, so importing the app stays cheap. warm_up() pays
+those costs up front. Under gunicorn with preload_app it runs once in the
+master (see gunicorn.conf.py) and every forked worker inherits the loaded
+modules and compiled patterns.
+"""
+import importlib
+import logging
+import time
+from typing import Dict, Iterable, Optional
+from .config import Config
+from .transform import HeuristicTransformer
+from .filter import TransactionFilter
+from .categorize import CategoryMapper
+
+
+# Heavy modules each input/output format needs on first use
+FORMAT_MODULES = {
+    "pdf": ["pdfplumber", "pdfplumber.utils"],
+    "csv": ["numpy", "pandas"],
+    "xlsx": ["openpyxl", "openpyxl.styles", "openpyxl.utils"],
+    "parquet": ["pyarrow", "pyarrow.parquet"],
+    "arrow": ["pyarrow", "pyarrow.ipc"],
+}
+
+# Synthetic rows that exercise every rule set once
+_SAMPLE_LINES = [
+    "01/02/2024 WARMUP COFFEE SHOP $12.34 1,000.00",
+    "01/03/2024 PAYROLL DIRECT DEPOSIT 2,500.00 3,500.00",
+]
+
+
+def warm_up(formats: Optional[Iterable[str]] = None, pipeline=None) -> Dict[str, float]:
+    """
+    Import the heavy modules for formats and compile the rule sets.
+
+    Args:
+        formats: Keys of FORMAT_MODULES to load (default: Config.WARMUP_FORMATS)
+        pipeline: ETLPipeline whose categorizer/filter should be warmed in place
+
+    Returns:
+        Milliseconds spent per module/step, plus 'total'
+    """
+    formats = Config.WARMUP_FORMATS if formats is None else list(formats)
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    for fmt in formats:
+        for module in FORMAT_MODULES.get(fmt, []):
+            t0 = time.perf_counter()
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                logging.warning(f"Warmup: could not import {module}: {e}")
+                continue
+            timings[module] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    _compile_rules(pipeline)
+    timings["rules"] = (time.perf_counter() - t0) * 1000
+
+    timings["total"] = (time.perf_counter() - started) * 1000
+    report_startup("warmup", timings)
+    return timings
+
+
+def _compile_rules(pipeline=None) -> None:
+    """Run each rule-based stage once so regexes and matchers are built."""
+    transformer = HeuristicTransformer()
+    tx_filter = pipeline.tx_filter if pipeline is not None else TransactionFilter()
+    mapper = pipeline.category_mapper if pipeline is not None else CategoryMapper()
+
+    rows = [tx for tx in (transformer._parse_line_heuristic(line, "warmup") for line in _SAMPLE_LINES) if tx]
+    eligible, _, _ = tx_filter.split(rows)
+    for tx in eligible:
+        mapper.categorize(tx["description"])
+
+
+def report_startup(stage: str, timings: Dict[str, float], budget_ms: float = Config.STARTUP_BUDGET_MS) -> None:
+    """Log a startup timing breakdown; a warning when the total exceeds budget_ms."""
+    total = timings.get("total", sum(timings.values()))
+    breakdown = ", ".join(f"{name}={ms:.0f}ms" for name, ms in timings.items() if name != "total")
+    level = logging.WARNING if total > budget_ms else logging.INFO
+    detail = f" ({breakdown})" if breakdown else ""
+    logging.log(level, f"Startup [{stage}]: {total:.0f}ms of {budget_ms:.0f}ms budget{detail}")
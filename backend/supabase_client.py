@@ -3,14 +3,10 @@ Supabase Logging Client - Hardened for Quota Persistence Debugging.
 """
 import os
 import logging
+import threading
 from typing import Dict, Any
 from datetime import datetime
 
-try:
-    from supabase import create_client, Client
-except ImportError:
-    Client = Any
-
 class SupabaseLogger:
     def __init__(self):
         # Allow both standard and VITE_ prefixed keys for compatibility
@@ -26,16 +22,47 @@ class SupabaseLogger:
                     logging.info(f"Aggressive Match: Found Service Key in {k}")
                     break
 
-        self.client = None
-        self.admin_client = None
+        self._client = None
+        self._admin_client = None
+        self._connected = False
+        self._connect_lock = threading.Lock()
         self.last_error = None
-        
-        if self.url and self.key:
+
+    @property
+    def client(self):
+        self._connect()
+        return self._client
+
+    @property
+    def admin_client(self):
+        self._connect()
+        return self._admin_client
+
+    def _connect(self) -> None:
+        """
+        Create the Supabase clients on first use rather than at construction,
+        so worker boot skips the supabase import and no HTTP client is
+        created in a gunicorn master and then shared across forked workers.
+        """
+        if self._connected:
+            return
+        with self._connect_lock:
+            if self._connected:
+                return
+            self._connected = True
+            if not (self.url and self.key):
+                return
+            try:
+                from supabase import create_client
+            except ImportError:
+                self.last_error = "Init Error: supabase package not installed"
+                logging.warning(self.last_error)
+                return
             try:
-                self.client = create_client(self.url, self.key)
+                self._client = create_client(self.url, self.key)
                 if self.service_key:
-                    self.admin_client = create_client(self.url, self.service_key)
-                logging.info(f"Supabase Init - Master Client: {bool(self.admin_client)}")
+                    self._admin_client = create_client(self.url, self.service_key)
+                logging.info(f"Supabase Init - Master Client: {bool(self._admin_client)}")
             except Exception as e:
                 self.last_error = f"Init Error: {str(e)}"
                 logging.warning(self.last_error)
@@ -142,6 +169,18 @@ class SupabaseLogger:
             logging.error(f"Failed to fetch tier for {user_id}: {e}")
             return "free" # Safe fallback for auth users
 
+    def get_user_category_rules(self, user_id: str):
+        """Fetches the account's category rule overrides (profiles.category_rules), or None."""
+        client = self.admin_client or self.client
+        if not client or not user_id:
+            return None
+        try:
+            res = client.table("profiles").select("category_rules").eq("id", user_id).single().execute()
+            return res.data.get("category_rules") if res.data else None
+        except Exception as e:
+            logging.error(f"Failed to fetch category rules for {user_id}: {e}")
+            return None # Fall back to the default rules
+
     def log_event(self, event_type: str, element: str, user_id: str = None) -> None:
         client = self.admin_client or self.client
         if not client: return
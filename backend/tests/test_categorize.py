@@ -0,0 +1,28 @@
+from etl.categorize import CategoryMapper, get_category_mapper, merge_rules, normalize_merchant
+
+
+def test_merchant_key_drops_store_numbers_and_dates():
+    assert normalize_merchant("STARBUCKS #1234 01/15") == normalize_merchant("Starbucks #0987") == "starbucks"
+
+
+def test_seven_eleven_override_matches():
+    mapper = CategoryMapper(merge_rules({"Convenience": ["7-11"]}))
+    assert mapper.categorize("7-11 #2345 DALLAS TX") == "Convenience"
+    assert mapper.categorize("7-11 STORE 01/05") == "Convenience"
+    # Defaults still apply to other descriptions
+    assert mapper.categorize("UBER TRIP") == "Transport"
+
+
+def test_raw_keyword_respects_category_order():
+    # Transport is listed before the override's category, so "uber" wins
+    rules = dict(merge_rules(None))
+    rules["Convenience"] = ["7-11"]
+    mapper = CategoryMapper(rules)
+    assert mapper.categorize("UBER 7-11 PICKUP") == "Transport"
+
+
+def test_per_run_tally():
+    mapper = get_category_mapper({"Coffee": ["coffee"]})
+    tally = mapper.new_tally()
+    mapper.categorize_batch(["COFFEE #1", "COFFEE #2", "COFFEE #1"], tally)
+    assert tally["hits"] + tally["misses"] == 2
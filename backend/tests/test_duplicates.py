@@ -0,0 +1,39 @@
+from etl.duplicates import DuplicateDetector
+
+
+def test_mixed_parsed_and_unparsed_dates():
+    found = DuplicateDetector().find(
+        dates=["2024-01-05", "02/30/2024", "2024-01-05", "02/30/2024", ""],
+        amounts=[10.0, 10.0, 10.0, 10.0, 10.0],
+        descriptions=["SHOP", "SHOP", "SHOP", "SHOP", "SHOP"],
+        tx_types=["debit"] * 5
+    )
+    # Unparsed dates only match the identical raw string
+    assert [(d.row, d.duplicate_of, d.days_apart) for d in found] == [(2, 0, 0), (3, 1, 0)]
+
+
+def test_recurring_charge_is_days_apart():
+    found = DuplicateDetector().find(
+        dates=["2024-01-02", "2024-01-03"],
+        amounts=[15.99, 15.99],
+        descriptions=["NETFLIX.COM", "NETFLIX.COM"],
+        tx_types=["debit", "debit"]
+    )
+    assert [(d.row, d.duplicate_of, d.days_apart) for d in found] == [(1, 0, 1)]
+
+
+def test_different_numbers_never_match():
+    found = DuplicateDetector().find(
+        dates=["2024-01-02", "2024-01-02"],
+        amounts=[50.0, 50.0],
+        descriptions=["CHECK 1043", "CHECK 1044"],
+        tx_types=["debit", "debit"]
+    )
+    assert found == []
+
+
+def test_find_in_statements():
+    first = [{"post_date": "2024-01-31", "amount": 9.99, "description": "SPOTIFY", "tx_type": "debit"}]
+    second = [{"post_date": "2024-01-31", "amount": 9.99, "description": "Spotify", "tx_type": "debit"}]
+    (dup,) = DuplicateDetector().find_in_statements([first, second])
+    assert (dup.statement, dup.row, dup.duplicate_of_statement, dup.duplicate_of) == (1, 0, 0, 0)
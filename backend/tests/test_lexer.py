@@ -0,0 +1,31 @@
+from etl.lexer import lex_line
+
+
+def test_unsigned_amounts():
+    lexed = lex_line("01/05 COFFEE SHOP 4.50 1,100.00")
+    assert lexed.date == "01/05"
+    assert lexed.amounts == [4.5, 1100.0]
+    assert lexed.description == "COFFEE SHOP"
+    assert lexed.kind == "transaction"
+
+
+def test_sign_forms_are_negative_and_consumed():
+    for line in ("01/05 REFUND (3.00) 103.00", "01/05 REFUND 3.00- 103.00",
+                 "01/05 REFUND -3.00 103.00", "01/05 REFUND $-3.00 103.00",
+                 "01/05 REFUND -$3.00 103.00"):
+        lexed = lex_line(line)
+        assert lexed.amounts == [-3.0, 103.0], line
+        assert lexed.description == "REFUND", line
+
+
+def test_hyphen_inside_words_is_not_a_sign():
+    lexed = lex_line("01/05 PRE-AUTH HOLD 5.00")
+    assert lexed.amounts == [5.0]
+    assert lexed.description == "PRE-AUTH HOLD"
+
+
+def test_undated_balance_line():
+    lexed = lex_line("Opening balance 100.00")
+    assert lexed.date is None
+    assert lexed.kind == "balance"
+    assert lex_line("no date and no balance 5.00") is None
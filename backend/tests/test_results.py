@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from etl.load import UniversalLoader
+from etl.results import ResultStore
+
+RESULT_ID = ResultStore.make_id("a" * 64, "b" * 16)
+TRANSACTIONS = [{"post_date": "2024-01-02", "description": "COFFEE", "amount": 4.5, "tx_type": "debit",
+                 "category": "Meals", "balance": None,
+                 "metadata": {"dq_flag": "CLEAN", "extraction_method": "table"}}]
+
+
+def test_token_resolves_and_result_id_does_not(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.put(RESULT_ID, TRANSACTIONS, {}, "1")
+    token = store.issue_token(RESULT_ID)
+    assert token != store.issue_token(RESULT_ID)
+    assert store.resolve(token) == RESULT_ID
+    with pytest.raises(ValueError):
+        store.resolve(RESULT_ID)
+    assert store.resolve("A" * 43) is None
+
+
+def test_render_is_keyed_by_pipeline_version(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.put(RESULT_ID, TRANSACTIONS, {}, "1")
+    path = store.render(RESULT_ID, "csv", UniversalLoader(), "1")
+    assert os.path.basename(path) == f"{RESULT_ID}.v1.csv"
+    assert store.render(RESULT_ID, "csv", UniversalLoader(), "2") is None
+
+
+def test_sweep_removes_expired_files(tmp_path):
+    store = ResultStore(str(tmp_path), ttl_seconds=60)
+    store.put(RESULT_ID, TRANSACTIONS, {}, "1")
+    token = store.issue_token(RESULT_ID)
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (0, 0))
+    assert store.sweep() == 2
+    assert store.resolve(token) is None
@@ -0,0 +1,25 @@
+from etl.transform import HeuristicTransformer
+
+
+def _table(*rows):
+    return [{"type": "table_row", "data": row} for row in (["Date", "Description", "Amount"],) + rows]
+
+
+def test_repeated_rows_are_kept_and_text_overlap_dropped():
+    transactions = HeuristicTransformer().transform({
+        "document_hash": "doc",
+        "fragments": _table(["01/05/2024", "COFFEE", "-4.50"], ["01/05/2024", "COFFEE", "-4.50"]),
+        "raw_text": "01/05/2024 COFFEE (4.50)\n01/05/2024 COFFEE (4.50)\n01/06/2024 MISSED 9.00"
+    })
+    assert [(tx["description"], tx["metadata"]["extraction_method"]) for tx in transactions] == [
+        ("COFFEE", "table"), ("COFFEE", "table"), ("MISSED", "heuristic")
+    ]
+
+
+def test_repeated_text_lines_are_kept():
+    transactions = HeuristicTransformer().transform({
+        "document_hash": "doc",
+        "fragments": [],
+        "raw_text": "01/05/2024 COFFEE 4.50 95.50\n01/05/2024 COFFEE 4.50 91.00"
+    })
+    assert len(transactions) == 2
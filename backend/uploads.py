@@ -0,0 +1,67 @@
+"""
+Upload Ingestion - Single pass over the upload stream.
+
+Writing to disk, enforcing the tier size limit and computing the SHA-256
+document hash all happen in one read of the stream, so the saved file is
+never re-read just to measure or hash it.
+"""
+import os
+import hashlib
+from typing import BinaryIO, Optional, Tuple
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Allowance for multipart boundaries and the other form fields when
+# comparing the request Content-Length against a file size limit.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds its size limit."""
+    
+    def __init__(self, max_bytes: int, size: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.size = size
+        max_mb = max_bytes / (1024 * 1024)
+        if size is not None:
+            message = f"File too large ({size / (1024 * 1024):.1f}MB). Max is {max_mb:g}MB."
+        else:
+            message = f"File too large. Max is {max_mb:g}MB."
+        super().__init__(message)
+
+
+def check_content_length(content_length: Optional[int], max_bytes: int) -> None:
+    """
+    Reject early from the declared request size, before any of the body is read.
+    Requests without a Content-Length are still bounded by ingest_upload().
+    """
+    if content_length and content_length > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise UploadTooLarge(max_bytes, content_length)
+
+
+def ingest_upload(stream: BinaryIO, dest_path: str, max_bytes: int,
+                  chunk_size: int = CHUNK_SIZE) -> Tuple[int, str]:
+    """
+    Copy the upload stream to dest_path while enforcing max_bytes and hashing.
+    
+    The partial file is removed if the limit is hit or the copy fails.
+    
+    Returns:
+        Tuple of (size_in_bytes, sha256_hexdigest)
+    """
+    sha256_hash = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest_path, "wb") as out:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                sha256_hash.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return size, sha256_hash.hexdigest()
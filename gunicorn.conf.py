@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for the API (Procfile: gunicorn -c gunicorn.conf.py --chdir backend app:app).
+
+preload_app imports the Flask app once in the master. when_ready then runs the
+ETL warmup there, before any worker is forked, so workers start with pdfplumber,
+pandas, openpyxl and the compiled rule sets already loaded.
+
+The ETL pipeline is reentrant, so each worker may serve several conversions
+at once on threads (GUNICORN_THREADS > 1 selects the gthread worker).
+"""
+import os
+import sys
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+
+def when_ready(server):
+    # Reuse the preloaded app's modules so the warmup hits the same rule objects
+    app_module = sys.modules.get("app")
+    if app_module is not None and hasattr(app_module, "warm_up"):
+        app_module.warm_up(pipeline=app_module.etl_pipeline)
+        return
+
+    try:
+        from backend.etl.warmup import warm_up
+    except ImportError:
+        from etl.warmup import warm_up
+    warm_up()
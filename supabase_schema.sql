@@ -11,10 +11,14 @@ CREATE TABLE IF NOT EXISTS public.profiles (
     id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
     tier TEXT DEFAULT 'free' CHECK (tier IN ('guest', 'free', 'pro')),
     ls_subscription_id TEXT,
+    category_rules JSONB, -- Per-account category overrides: {"Category": ["keyword", ...]}
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Existing installs: add the category overrides column
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS category_rules JSONB;
+
 -- Enable RLS
 ALTER TABLE public.profiles ENABLE ROW LEVEL SECURITY;
 
@@ -118,7 +122,7 @@ CREATE INDEX IF NOT EXISTS idx_events_user_id ON public.events(user_id);
 -- SUMMARY
 -- ============================================
 -- Tables created:
---   1. profiles     - User profiles with tier (guest/free/pro)
+--   1. profiles     - User profiles with tier (guest/free/pro) and category overrides
 --   2. conversions  - Conversion logs with DQ stats
 --   3. events       - UI event tracking
 --